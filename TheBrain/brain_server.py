@@ -2,10 +2,15 @@ import json
 import socket
 import time
 import os
-import glob
 from llama_cpp import Llama
 import win32pipe, win32file, pywintypes
 import threading
+import select
+from core_link import encode_delta, encode_end, encode_reply
+from job_scheduler import JobScheduler, PRIORITY_CHAT, PRIORITY_CODE, PRIORITY_LOGS
+from prefix_cache import PrefixStateCache
+from code_watcher import CodeWatcher
+from log_sentinel import LogSentinel
 
 # --- Config ---
 HOST_IP = "127.0.0.1"
@@ -19,6 +24,9 @@ MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "Llama-3.1-8B-Instruct-Q6_K.gg
 UNITY_SCRIPTS_PATH = os.path.join(PROJECT_ROOT, "unity_scripts")
 UNITY_LOG_PATH = os.path.expandvars(r"%LOCALAPPDATA%\Unity\Editor\Editor.log")
 PIPE_NAME = r'\\.\pipe\SYNZ_NeuroLink'
+PREFIX_CACHE_DIR = os.path.join(SCRIPT_DIR, "prefix_cache") # [NEW] Saved system-prompt KV states
+N_CTX = 2048
+N_GPU_LAYERS = 35
 
 # Colors
 from colorama import init, Fore
@@ -33,8 +41,8 @@ try:
     print(f"{C_BRAIN}[BRAIN] Loading Llama-3 (This takes a moment)...")
     llm = Llama(
         model_path=MODEL_PATH,
-        n_ctx=2048,
-        n_gpu_layers=35, # Attempt GPU offload
+        n_ctx=N_CTX,
+        n_gpu_layers=N_GPU_LAYERS, # Attempt GPU offload
         chat_format="llama-3", # [FIX] Force Llama-3 format
         verbose=False
     )
@@ -44,6 +52,17 @@ except Exception as e:
     # Fallback or exit?
     llm = None
 
+# 1.5 [NEW] System-Prompt Prefix Cache (survives restarts)
+prefix_cache = None
+if llm:
+    try:
+        prefix_cache = PrefixStateCache(llm, MODEL_PATH, PREFIX_CACHE_DIR, n_ctx=N_CTX, n_gpu_layers=N_GPU_LAYERS)
+        restored = prefix_cache.load_from_disk()
+        print(f"{C_BRAIN}[BRAIN] Prefix Cache: {restored} saved prompt state(s) restored.")
+    except Exception as e:
+        print(f"{C_ERR}[BRAIN] Prefix Cache disabled: {e}")
+        prefix_cache = None
+
 # 2. Named Pipe Server (NeuroLink to Unity)
 pipe_handle = None
 
@@ -89,31 +108,22 @@ def send_to_unity(msg):
 # So we drop the Named Pipe here.
 
 # 3. File Watchers
-file_stamps = {}
+# [NEW] Event-driven code watcher (watchdog, 1s polling fallback) instead of glob + getmtime every loop.
+# Reviews get unified diffs against the last reviewed version, not whole files.
+code_watcher = CodeWatcher(UNITY_SCRIPTS_PATH, extensions=(".cs",))
+if code_watcher.start():
+    print(f"{C_BRAIN}[WATCHER] Watching {UNITY_SCRIPTS_PATH} ({code_watcher.mode}).")
 
 def check_code():
-    global file_stamps
-    changes = []
-    
-    if not os.path.exists(UNITY_SCRIPTS_PATH): return None
-
-    # Scan .cs files
-    files = glob.glob(os.path.join(UNITY_SCRIPTS_PATH, "*.cs"))
-    for f in files:
-        mtime = os.path.getmtime(f)
-        if f not in file_stamps:
-            file_stamps[f] = mtime
-        elif file_stamps[f] != mtime:
-            file_stamps[f] = mtime
+    """Returns the set of scripts whose save burst has settled, or None."""
+    changed = code_watcher.poll()
+    if changed:
+        for f in changed:
             print(f"{C_BRAIN}[WATCHER] Code Changed: {os.path.basename(f)}")
-            with open(f, 'r', encoding='utf-8') as code_file:
-                 changes.append(code_file.read())
-    
-    if changes:
-        return "\n".join(changes)
-    return None
+    return changed
 
 last_log_pos = 0
+log_sentinel = LogSentinel(window=60.0, cooldown=300.0) # [NEW] Error fingerprints + rate limiting
 
 def check_logs():
     global last_log_pos
@@ -133,7 +143,139 @@ def check_logs():
         pass
     return None
 
-# 4. Main Loop
+# 4. Model Jobs (only ever run on the scheduler's worker thread)
+def handle_chat(request):
+    decoded_data, addr = request
+    messages = []
+    stream_id = None # [NEW] Set when the Face wants the reply token by token
+    request_id = None # [NEW] Echoed back so the Face can match the reply to its request
+    
+    # [FIX] Try to parse as JSON first (Structured Chat)
+    try:
+        packet = json.loads(decoded_data)
+        request_id = packet.get("id")
+        if packet.get("stream") and request_id:
+            stream_id = request_id
+        
+        # 1. System Prompt
+        if "system" in packet:
+            messages.append({"role": "system", "content": packet["system"]})
+            
+        # 2. History (List of {role, content})
+        if "history" in packet and isinstance(packet["history"], list):
+            messages.extend(packet["history"])
+            
+        # 3. User Input
+        if "user" in packet:
+            messages.append({"role": "user", "content": packet["user"]})
+            
+        print(f"{C_BRAIN}[REQ] Structured Chat ({len(messages)} msgs)...")
+        
+    except json.JSONDecodeError:
+        # Fallback: Legacy String Mode
+        prompt = decoded_data
+        messages = [{"role": "user", "content": prompt}]
+        print(f"{C_BRAIN}[REQ] Legacy Prompt...")
+    
+    # Inference
+    print(f"{C_BRAIN}[DEBUG] Messages: {messages}") # Debug Print
+    if prefix_cache:
+        # Put the system prompt's KV state back so only the new turn gets evaluated
+        try:
+            prefix_cache.prepare(messages)
+        except Exception as e:
+            print(f"{C_ERR}[PREFIX] {e}")
+    output = llm.create_chat_completion(
+        messages=messages, # [FIX] Restored missing argument
+        temperature=0.7,
+        top_p=0.9,
+        repeat_penalty=1.25, # [TUNED] Relaxed from 1.3 for better fluency
+        stop=["<|eot_id|>"],
+        stream=stream_id is not None
+    )
+    if stream_id:
+        # [NEW] Streaming: forward every token as soon as Llama produces it
+        pieces = []
+        for chunk in output:
+            delta = chunk['choices'][0]['delta'].get('content')
+            if not delta:
+                continue
+            sock.sendto(encode_delta(stream_id, len(pieces), delta), addr)
+            pieces.append(delta)
+        response = "".join(pieces)
+    else:
+        response = output['choices'][0]['message']['content']
+    
+    # [FIX] Anti-Parrot Guard
+    # If Model just repeats the User, we intercept it.
+    last_user_input = messages[-1]['content'].strip().lower()
+    if response.strip().lower() == last_user_input:
+        print(f"{C_ERR}[GUARD] Blocked Parrot Response ('{response}'). forcing fallback.")
+        response = "I am SYNZ. I am listening."
+    elif response.strip() == "":
+         response = "..."
+    
+    # Reply
+    print(f"{C_BRAIN}[ANS] {response[:50]}...")
+    if stream_id:
+        # End-of-stream marker carries the final (guarded) text
+        sock.sendto(encode_end(stream_id, len(pieces), response), addr)
+    elif request_id:
+        sock.sendto(encode_reply(request_id, response), addr)
+    else:
+        sock.sendto(response.encode('utf-8'), addr)
+
+def handle_code(paths):
+    # Diff is taken here (not when the change was seen) so coalesced jobs review everything since last time
+    code_diff = code_watcher.diff(paths)
+    if not code_diff:
+        return
+    prompt = f"REVIEW THESE CODE CHANGES (unified diff):\n{code_diff}\nIdentify any bugs briefly."
+    output = llm.create_chat_completion(messages=[{"role": "user", "content": prompt}])
+    feedback = output['choices'][0]['message']['content']
+    print(f"{C_BRAIN}[SENTINEL] {feedback}")
+    # Send to Face (who will speak it)
+    msg = f"[SYSTEM_EVENT: Code Watcher]: {feedback}"
+    sock.sendto(msg.encode('utf-8'), FACE_ADDR)
+
+def handle_logs(alerts):
+    # [NEW] One entry per error fingerprint, with how often it fired (not the raw spam)
+    report = []
+    for alert in alerts:
+        report.append(f"[seen {alert['count']}x, {alert['in_window']}x in the last minute]\n{alert['sample'][:800]}")
+    log_snippet = "\n\n".join(report)[-2000:]
+    
+    print(f"{C_BRAIN}[SENTINEL] analyzing {len(alerts)} error group(s)...")
+    prompt = f"Analyze this UNITY LOG ERROR concisely:\n{log_snippet}\nExplain what is broken."
+    
+    try:
+        output = llm.create_chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=100, # Keep it short
+            temperature=0.5
+        )
+        feedback = output['choices'][0]['message']['content']
+        print(f"{C_BRAIN}[LOGS] {feedback}")
+        
+        # Send to Face (System Event)
+        msg = f"[SYSTEM_EVENT: Log Watcher]: {feedback}"
+        sock.sendto(msg.encode('utf-8'), FACE_ADDR)
+    except Exception as e:
+        print(f"{C_ERR}[LOG ERR] {e}")
+
+# [NEW] Job Scheduler: chat > code review > log analysis, one worker owns the model.
+# While a watcher job is still queued, newer watcher output is folded into it (stale work never piles up).
+scheduler = JobScheduler(
+    handlers={"chat": handle_chat, "code": handle_code, "logs": handle_logs},
+    priorities={"chat": PRIORITY_CHAT, "code": PRIORITY_CODE, "logs": PRIORITY_LOGS},
+    coalesce={
+        "code": lambda old, new: old | new,      # Set of changed scripts
+        "logs": lambda old, new: old + new,      # Lists of error-group alerts
+    }
+)
+STATS_INTERVAL = 60.0 # Seconds between queue reports
+
+# 5. Main Loop (network + watchers only, never blocks on the model)
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # [FIX] Allow port reuse on restart
 sock.bind((HOST_IP, CORE_PORT))
@@ -141,117 +283,45 @@ sock.setblocking(False)
 
 FACE_ADDR = (HOST_IP, 8005)
 
+scheduler.start()
 print(f"{C_BRAIN}[BRAIN] Logic Core Listening on {CORE_PORT}...")
+last_report = time.time()
 
 while True:
     try:
-        # A. Network Request (From Face)
-        try:
-            data, addr = sock.recvfrom(65535) # Increased from 4096 to prevent WinError 10040
-            decoded_data = data.decode('utf-8')
-            
-            messages = []
-            
-            # [FIX] Try to parse as JSON first (Structured Chat)
+        # A. Network Requests (From Face) -> wake up as soon as one arrives
+        select.select([sock], [], [], 0.1)
+        while True:
             try:
-                packet = json.loads(decoded_data)
-                
-                # 1. System Prompt
-                if "system" in packet:
-                    messages.append({"role": "system", "content": packet["system"]})
-                    
-                # 2. History (List of {role, content})
-                if "history" in packet and isinstance(packet["history"], list):
-                    messages.extend(packet["history"])
-                    
-                # 3. User Input
-                if "user" in packet:
-                    messages.append({"role": "user", "content": packet["user"]})
-                    
-                print(f"{C_BRAIN}[REQ] Structured Chat ({len(messages)} msgs)...")
-                
-            except json.JSONDecodeError:
-                # Fallback: Legacy String Mode
-                prompt = decoded_data
-                messages = [{"role": "user", "content": prompt}]
-                print(f"{C_BRAIN}[REQ] Legacy Prompt...")
-            
-            # Inference
-            print(f"{C_BRAIN}[DEBUG] Messages: {messages}") # Debug Print
-            output = llm.create_chat_completion(
-                messages=messages, # [FIX] Restored missing argument
-                temperature=0.7,
-                top_p=0.9,
-                repeat_penalty=1.25, # [TUNED] Relaxed from 1.3 for better fluency
-                stop=["<|eot_id|>"]
-            )
-            response = output['choices'][0]['message']['content']
-            
-            # [FIX] Anti-Parrot Guard
-            # If Model just repeats the User, we intercept it.
-            last_user_input = messages[-1]['content'].strip().lower()
-            if response.strip().lower() == last_user_input:
-                print(f"{C_ERR}[GUARD] Blocked Parrot Response ('{response}'). forcing fallback.")
-                response = "I am SYNZ. I am listening."
-            elif response.strip() == "":
-                 response = "..."
-            
-            # Reply
-            print(f"{C_BRAIN}[ANS] {response[:50]}...")
-            sock.sendto(response.encode('utf-8'), addr)
-            
-        except BlockingIOError:
-            pass
+                data, addr = sock.recvfrom(65535) # Increased from 4096 to prevent WinError 10040
+            except BlockingIOError:
+                break
+            scheduler.submit("chat", (data.decode('utf-8'), addr))
 
         # B. Check Code
-        code_diff = check_code()
-        if code_diff:
-            prompt = f"REVIEW THIS CODE:\n{code_diff}\nIdentify any bugs briefly."
-            output = llm.create_chat_completion(messages=[{"role": "user", "content": prompt}])
-            feedback = output['choices'][0]['message']['content']
-            print(f"{C_BRAIN}[SENTINEL] {feedback}")
-            # Send to Face (who will speak it)
-            msg = f"[SYSTEM_EVENT: Code Watcher]: {feedback}"
-            sock.sendto(msg.encode('utf-8'), FACE_ADDR)
+        code_changes = check_code()
+        if code_changes:
+            scheduler.submit("code", code_changes)
 
         # C. Check Logs (Smart Sentinel)
+        # [NEW] Errors are fingerprinted (addresses/line numbers/timestamps stripped) and counted.
+        # A NullRef spamming 60x a second reaches the model once per cooldown, with its count attached.
         logs = check_logs()
-        if logs and ("Error" in logs or "Exception" in logs):
-             # [FIX] Anti-Spam: Don't report the exact same log chunk twice
-             # We rely on 'check_logs' returning new data, but if the error implies a generic state...
-             # Actually check_logs output is already diff-based? 
-             # No, check_logs reads from last_log_pos. So it's ALWAYS new data.
-             # BUT Unity might spam the same error 60 times a second.
-             
-             # Heuristic: deduplicate lines? Or just report summary.
-             # For now, we trust the LLM to summarize, but we limit frequency?
-             # Let's just run it. check_logs only returns NEW appended content. 
-             # If Unity spams 1000 lines of NullRef, we get a huge chunk.
-             
-             # Truncate to last 1000 chars to save tokens
-             log_snippet = logs[-1000:]
-             
-             print(f"{C_BRAIN}[SENTINEL] analyzing new errors...")
-             prompt = f"Analyze this UNITY LOG ERROR concisely:\n{log_snippet}\nExplain what is broken."
-             
-             try:
-                 output = llm.create_chat_completion(
-                     messages=[{"role": "user", "content": prompt}],
-                     max_tokens=100, # Keep it short
-                     temperature=0.5
-                 )
-                 feedback = output['choices'][0]['message']['content']
-                 print(f"{C_BRAIN}[LOGS] {feedback}")
-                 
-                 # Send to Face (System Event)
-                 msg = f"[SYSTEM_EVENT: Log Watcher]: {feedback}"
-                 sock.sendto(msg.encode('utf-8'), FACE_ADDR)
-             except Exception as e:
-                 print(f"{C_ERR}[LOG ERR] {e}")
+        if logs:
+            log_sentinel.ingest(logs)
+        alerts = log_sentinel.escalations()
+        if alerts:
+            scheduler.submit("logs", alerts)
 
-        time.sleep(0.1)
+        if time.time() - last_report > STATS_INTERVAL:
+            last_report = time.time()
+            print(f"{C_BRAIN}[QUEUE]\n{scheduler.report()}")
+            if prefix_cache:
+                print(f"{C_BRAIN}[PREFIX] {prefix_cache.report()}")
+            print(f"{C_BRAIN}[SENTINEL] {log_sentinel.report()}")
 
     except KeyboardInterrupt:
+        scheduler.stop()
         break
     except Exception as e:
         print(f"{C_ERR}[ERR] {e}")
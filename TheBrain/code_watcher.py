@@ -0,0 +1,156 @@
+import os
+import time
+import difflib
+import threading
+
+# Native file events (inotify / ReadDirectoryChangesW) if watchdog is installed, else polling
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+    FileSystemEventHandler = object
+
+class _EventBridge(FileSystemEventHandler):
+    """Content changes only: inotify also reports opened/closed, and our own _read() would re-trigger a review."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        self._changed(event)
+
+    def on_modified(self, event):
+        self._changed(event)
+
+    def on_moved(self, event):
+        self._changed(event)
+
+    def on_deleted(self, event):
+        self._changed(event)
+
+    def _changed(self, event):
+        if event.is_directory:
+            return
+        self.watcher._touch(event.src_path)
+        dest = getattr(event, "dest_path", None)
+        if dest: # Editors often save via "write temp file, rename over original"
+            self.watcher._touch(dest)
+
+class CodeWatcher:
+    """Watches a folder tree for script changes and hands out unified diffs against the last reviewed version.
+
+    poll()   -> changed paths whose save burst has settled (cheap, call it every loop)
+    diff()   -> unified diff of those paths vs. what was last reviewed (marks them reviewed)
+    """
+
+    def __init__(self, root, extensions=(".cs",), debounce=0.75, poll_interval=1.0):
+        self.root = os.path.abspath(root)
+        self.extensions = tuple(extensions)
+        self.debounce = debounce           # Seconds of quiet before a change counts
+        self.poll_interval = poll_interval # Fallback scan period (only without watchdog)
+        self.lock = threading.Lock()
+        self.reviewed = {} # path -> text the LLM last saw
+        self.dirty = {}    # path -> time of the latest event
+        self.mtimes = {}   # polling fallback only
+        self.observer = None
+        self.running = False
+        self.mode = "off"
+
+    def _wanted(self, path):
+        return path.endswith(self.extensions)
+
+    def _scan(self):
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(folder, name)
+                if self._wanted(path):
+                    yield path
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        except OSError:
+            return None # Deleted or locked mid-save
+
+    def _touch(self, path):
+        if self._wanted(path):
+            with self.lock:
+                self.dirty[os.path.abspath(path)] = time.time()
+
+    def start(self):
+        if not os.path.isdir(self.root):
+            return False
+        # Baseline: everything that exists now counts as reviewed
+        for path in self._scan():
+            text = self._read(path)
+            if text is not None:
+                self.reviewed[path] = text
+                self.mtimes[path] = os.path.getmtime(path)
+        self.running = True
+        if HAS_WATCHDOG:
+            self.observer = Observer()
+            self.observer.schedule(_EventBridge(self), self.root, recursive=True)
+            self.observer.daemon = True
+            self.observer.start()
+            self.mode = "events"
+        else:
+            threading.Thread(target=self._poll_loop, name="CodeWatcherPoll", daemon=True).start()
+            self.mode = "polling"
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.observer:
+            self.observer.stop()
+
+    def _poll_loop(self):
+        while self.running:
+            seen = set()
+            for path in self._scan():
+                seen.add(path)
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                if self.mtimes.get(path) != mtime:
+                    self.mtimes[path] = mtime
+                    self._touch(path)
+            for path in set(self.mtimes) - seen:
+                del self.mtimes[path]
+                self._touch(path)
+            time.sleep(self.poll_interval)
+
+    def poll(self):
+        """Returns the set of paths that changed and then stayed quiet for `debounce` seconds, or None."""
+        if not self.dirty:
+            return None
+        now = time.time()
+        with self.lock:
+            settled = {p for p, t in self.dirty.items() if now - t >= self.debounce}
+            for path in settled:
+                del self.dirty[path]
+        return settled or None
+
+    def diff(self, paths, context=3):
+        """Unified diff of each path against its last reviewed text. Unchanged files are skipped."""
+        hunks = []
+        for path in sorted(paths):
+            new_text = self._read(path)
+            with self.lock:
+                old_text = self.reviewed.get(path, "")
+                if new_text is None:
+                    self.reviewed.pop(path, None)
+                    new_text = ""
+                else:
+                    self.reviewed[path] = new_text
+            if new_text == old_text:
+                continue
+            rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+            lines = difflib.unified_diff(
+                old_text.splitlines(keepends=True), new_text.splitlines(keepends=True),
+                fromfile=f"a/{rel}", tofile=f"b/{rel}", n=context)
+            hunks.append("".join(line if line.endswith("\n") else line + "\n" for line in lines))
+        return "".join(hunks)
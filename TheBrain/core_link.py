@@ -0,0 +1,246 @@
+import json
+import time
+import uuid
+import socket
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+# --- Face <-> Core Stream Protocol ---
+# Face asks:   {"system": ..., "history": [...], "user": ..., "stream": true, "id": "<request id>"}
+# Core sends:  {"id": ..., "seq": 0, "delta": "Hel"}, {"id": ..., "seq": 1, "delta": "lo"}, ...
+# and finally: {"id": ..., "seq": N, "done": true, "text": "<full reply>"}
+# "seq" of the end marker == number of delta packets, so the Face can tell if any went missing.
+# Not streaming: {"id": ..., "text": "<full reply>"} (no "seq"). Cores that predate ids answer with raw text.
+
+MAX_DATAGRAM = 60000 # Stay under the 65507 UDP payload limit
+
+def encode_delta(request_id, seq, delta):
+    return json.dumps({"id": request_id, "seq": seq, "delta": delta}).encode('utf-8')
+
+def encode_end(request_id, seq, text):
+    packet = {"id": request_id, "seq": seq, "done": True, "text": text}
+    data = json.dumps(packet).encode('utf-8')
+    if len(data) > MAX_DATAGRAM:
+        # Too big to repeat the full text; the Face rebuilds it from the deltas
+        packet["text"] = None
+        data = json.dumps(packet).encode('utf-8')
+    return data
+
+def encode_reply(request_id, text):
+    return json.dumps({"id": request_id, "text": text}).encode('utf-8')
+
+def decode_packet(data):
+    """Returns the stream packet dict, or None if this datagram is not part of a stream."""
+    try:
+        packet = json.loads(data.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(packet, dict) or "id" not in packet or "seq" not in packet:
+        return None
+    return packet
+
+class StreamAssembler:
+    """Puts delta packets back in order. feed() returns the text that just became contiguous."""
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.parts = []
+        self.pending = {} # seq -> delta that arrived early
+        self.next_seq = 0
+        self.end_seq = None
+        self.final_text = None
+        self.packets = 0
+
+    def feed(self, packet):
+        if packet.get("id") != self.request_id:
+            return ""
+        self.packets += 1
+        if packet.get("done"):
+            self.end_seq = packet["seq"]
+            self.final_text = packet.get("text")
+            return ""
+        seq = packet["seq"]
+        if seq < self.next_seq:
+            return "" # Duplicate
+        self.pending[seq] = packet.get("delta", "")
+        new_text = []
+        while self.next_seq in self.pending:
+            new_text.append(self.pending.pop(self.next_seq))
+            self.next_seq += 1
+        new_text = "".join(new_text)
+        self.parts.append(new_text)
+        return new_text
+
+    @property
+    def done(self):
+        return self.end_seq is not None
+
+    @property
+    def missing(self):
+        """Delta packets we never got (only meaningful once done)."""
+        if self.end_seq is None:
+            return 0
+        return self.end_seq - self.next_seq
+
+    def text(self):
+        # The end marker carries the authoritative reply (it may include Core-side guard fixes)
+        if self.final_text is not None:
+            return self.final_text
+        return "".join(self.parts)
+
+# --- Request/Reply Correlation ---
+class PendingRequest:
+    def __init__(self, request_id, on_delta):
+        self.future = Future()
+        self.stream = StreamAssembler(request_id)
+        self.on_delta = on_delta
+        self.last_activity = time.time() # Timeout counts from the latest packet, not the start
+
+class CoreLink:
+    """Owns a private socket to the Core and matches every reply to its request by id.
+
+    request() can be called from any thread, with several requests in flight; one receiver thread
+    resolves the pending futures. Replies nobody waits for any more are dropped and counted:
+    late = the request timed out, orphaned = unknown id (or untagged while several are pending).
+    """
+
+    def __init__(self, core_addr, timeout=30.0, bind_ip="127.0.0.1", remember_expired=256):
+        self.core_addr = core_addr
+        self.timeout = timeout
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((bind_ip, 0))
+        self.sock.settimeout(1.0) # Lets the receiver notice stop()
+        self.lock = threading.Lock()
+        self.pending = {} # request id -> PendingRequest
+        self.expired = OrderedDict() # Ids we gave up on (tells "late" from "orphaned")
+        self.remember_expired = remember_expired
+        self.running = False
+        self.thread = None
+        # Stats
+        self.sent = 0
+        self.answered = 0
+        self.timeouts = 0
+        self.late = 0
+        self.orphaned = 0
+        self.legacy = 0
+        self.lost_packets = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="CoreLink", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def submit(self, packet, on_delta=None):
+        """Sends a request dict (an "id" is added if missing). Returns (request id, Future of the reply text)."""
+        request = self._send(packet, on_delta)
+        return request.stream.request_id, request.future
+
+    def _send(self, packet, on_delta):
+        packet = dict(packet)
+        request_id = packet.setdefault("id", uuid.uuid4().hex)
+        request = PendingRequest(request_id, on_delta)
+        with self.lock:
+            self.pending[request_id] = request
+            self.sent += 1
+        try:
+            self.sock.sendto(json.dumps(packet).encode('utf-8'), self.core_addr)
+        except OSError:
+            with self.lock:
+                self.pending.pop(request_id, None)
+            raise
+        return request
+
+    def request(self, packet, on_delta=None, timeout=None):
+        """Blocking call. Raises TimeoutError when the Core goes quiet for `timeout` seconds."""
+        timeout = timeout or self.timeout
+        request = self._send(packet, on_delta)
+        request_id, future = request.stream.request_id, request.future
+        while True:
+            try:
+                return future.result(timeout=0.25)
+            except FutureTimeout:
+                if time.time() - request.last_activity >= timeout:
+                    self._abandon(request_id)
+                    if future.done() and not future.cancelled():
+                        return future.result() # Answer slipped in at the last moment
+                    raise TimeoutError(f"Core sent nothing for {timeout:.0f}s")
+
+    def _abandon(self, request_id):
+        with self.lock:
+            request = self.pending.pop(request_id, None)
+            if request is None:
+                return
+            self.timeouts += 1
+            self.expired[request_id] = time.time()
+            while len(self.expired) > self.remember_expired:
+                self.expired.popitem(last=False)
+        request.future.cancel()
+
+    def _resolve(self, request_id, text):
+        with self.lock:
+            request = self.pending.pop(request_id, None)
+            if request is None:
+                return
+            self.answered += 1
+            self.lost_packets += request.stream.missing
+        request.future.set_result(text)
+
+    def _run(self):
+        while self.running:
+            try:
+                data, _ = self.sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                continue # e.g. WinError 10054 after sending to a Core that is not running
+            self._dispatch(data)
+
+    def _dispatch(self, data):
+        try:
+            message = json.loads(data.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            message = None
+
+        if not isinstance(message, dict) or "id" not in message:
+            # Untagged (old Core): only unambiguous when exactly one request is waiting
+            with self.lock:
+                only = next(iter(self.pending)) if len(self.pending) == 1 else None
+                if only is None:
+                    self.orphaned += 1
+                    return
+                self.legacy += 1
+            self._resolve(only, data.decode('utf-8', errors='replace'))
+            return
+
+        request_id = message["id"]
+        with self.lock:
+            request = self.pending.get(request_id)
+            if request is None:
+                if request_id in self.expired:
+                    self.late += 1
+                else:
+                    self.orphaned += 1
+                return
+        request.last_activity = time.time()
+
+        if "seq" not in message:
+            self._resolve(request_id, message.get("text") or "")
+            return
+        new_text = request.stream.feed(message)
+        if new_text and request.on_delta:
+            try:
+                request.on_delta(new_text)
+            except Exception as e:
+                print(f"[CORE LINK] on_delta failed: {e}")
+        if request.stream.done:
+            self._resolve(request_id, request.stream.text())
+
+    def report(self):
+        return (f"core link: sent={self.sent} answered={self.answered} pending={len(self.pending)} "
+                f"timeouts={self.timeouts} late={self.late} orphaned={self.orphaned} legacy={self.legacy} "
+                f"lost_packets={self.lost_packets}")
@@ -1,11 +1,14 @@
 import torch
 import pickle
 import os
-from model import NanoSYNZ
+import io
+import time
+from model import NanoSYNZ, load_checkpoint, load_quantized, describe_quantization
 
 # Config
 script_dir = os.path.dirname(os.path.abspath(__file__))
 model_path = os.path.join(script_dir, "synz_face.pth")
+txt_path = os.path.join(script_dir, "data", "training_data.txt")
 meta_path = os.path.join(script_dir, "meta.pkl")
 device = 'cpu'
 
@@ -30,9 +33,9 @@ if not os.path.exists(model_path):
     print("[FAIL] synz_face.pth not found!")
     exit()
 
-model = NanoSYNZ(vocab_size=vocab_size, n_embed=384, block_size=64, n_head=6, n_layer=6)
+model = NanoSYNZ(vocab_size=vocab_size, n_embed=384, block_size=64, n_head=6, n_layer=6, fused=True)
 try:
-    model.load_state_dict(torch.load(model_path, map_location=device))
+    load_checkpoint(model, model_path, map_location=device)
     print("[PASS] Weights Loaded.")
 except Exception as e:
     print(f"[FAIL] Weight mismatch or load error: {e}")
@@ -58,3 +61,31 @@ if "User:" in output:
     print("[CONCLUSION] Model structure seems preserved.")
 else:
     print("[CONCLUSION] Model might be babbling.")
+
+# 4. [NEW] Int8 Mode (what face_server runs with INT8_PERSONALITY)
+print("\n[TEST] Int8 dynamic quantization...")
+val_tokens = None
+if os.path.exists(txt_path):
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    val_tokens = torch.tensor(encode(text[int(0.9 * len(text)):]), dtype=torch.long) # train_scratch.py's val split
+fresh = NanoSYNZ(vocab_size=vocab_size, n_embed=384, block_size=64, n_head=6, n_layer=6, fused=True)
+qmodel, info = load_quantized(fresh, model_path, val_tokens=val_tokens, map_location=device)
+print(f"[INFO] Int8 vs fp32: {describe_quantization(info)}")
+
+def weight_mb(m):
+    buf = io.BytesIO()
+    torch.save(m.state_dict(), buf)
+    return buf.tell() / (1024 * 1024)
+
+def ms_per_token(m, n=50):
+    torch.manual_seed(0)
+    start = time.perf_counter()
+    m.generate(idx, max_new_tokens=n)
+    return 1000 * (time.perf_counter() - start) / n
+
+model.reset_cache()
+print(f"[INFO] Weights: fp32 {weight_mb(model):.1f}MB | int8 {weight_mb(qmodel):.1f}MB")
+print(f"[INFO] Latency: fp32 {ms_per_token(model):.2f}ms/token | int8 {ms_per_token(qmodel):.2f}ms/token")
+output = decode(qmodel.generate(idx, max_new_tokens=50)[0].tolist())
+print(f"\n[INT8 OUTPUT]:\n{output}\n")
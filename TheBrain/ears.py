@@ -2,6 +2,8 @@ import sounddevice as sd
 import numpy as np
 import whisper
 import socket
+import select
+import threading
 import time
 import queue
 import scipy.io.wavfile as wav
@@ -9,10 +11,14 @@ import scipy.io.wavfile as wav
 # --- Configuration ---
 HOST_IP = "127.0.0.1"
 HOST_PORT = 8005
+CMD_PORT = 8007 # [FIX] Face Server sends MUTE/UNMUTE here (EARS_ADDR)
 SAMPLE_RATE = 16000
 BLOCK_SIZE = 4000 
 THRESHOLD = 0.02 # RMS Threshold (Silence is usually < 0.01)
 SILENCE_DURATION = 0.8 # [TUNED] Increased slightly to prevent chopping
+RING_SECONDS = 30 # [NEW] Fixed capture memory (multiple of the block length)
+MAX_UTTERANCE = RING_SECONDS / 2 # Longer speech goes to Whisper in pieces, the other half is backlog headroom
+UTTERANCE_QUEUE = 4 # [NEW] Utterances waiting for Whisper before the oldest is dropped
 
 print("[EARS] Loading Model 'small.en' for high accuracy... (This may take a moment)")
 model = whisper.load_model("small.en") # [UPGRADE] Base -> Small (Cleaner STT)
@@ -22,29 +28,113 @@ sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 sock.bind(('0.0.0.0', 0)) # Bind to ephemeral port to receive replies
 sock.setblocking(False) # Enable non-blocking mode for listening
 
+# [FIX] The command socket was never created, so MUTE never arrived
+cmd_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+cmd_sock.bind((HOST_IP, CMD_PORT))
+cmd_sock.setblocking(False)
+
+# [NEW] The audio callback pokes this pair so the loop can select() on audio and sockets together
+wake_r, wake_w = socket.socketpair()
+wake_r.setblocking(False)
+wake_w.setblocking(False)
+
+# --- [NEW] Capture Ring ---
+class AudioRing:
+    """Preallocated float32 ring of mic samples. Positions are absolute sample counts, so an
+    utterance is just (start, end) and reading it back is a view (a copy only if it wraps)."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buf = np.zeros(capacity, dtype=np.float32)
+        self.written = 0 # Total samples ever written
+
+    def write(self, samples):
+        samples = samples.reshape(-1)
+        n = len(samples)
+        if n > self.capacity:
+            self.written += n - self.capacity
+            samples, n = samples[-self.capacity:], self.capacity
+        i = self.written % self.capacity
+        first = min(n, self.capacity - i)
+        self.buf[i:i + first] = samples[:first]
+        self.buf[:n - first] = samples[first:]
+        self.written += n
+        return self.written
+
+    def parts(self, start, end):
+        """Views covering samples [start, end): one, or two when the range wraps around."""
+        if not (self.written - self.capacity <= start <= end <= self.written):
+            raise ValueError(f"Samples {start}..{end} are not in the ring (written={self.written})")
+        i = start % self.capacity
+        n = end - start
+        if i + n <= self.capacity:
+            return [self.buf[i:i + n]]
+        return [self.buf[i:], self.buf[:i + n - self.capacity]]
+
+    def read(self, start, end):
+        parts = self.parts(start, end)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+def frame_rms(samples, frame=BLOCK_SIZE):
+    """RMS of every whole frame in one vectorized pass."""
+    n = len(samples) // frame * frame
+    frames = samples[:n].reshape(-1, frame)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame)
+
 audio_queue = queue.Queue()
-recording_buffer = []
+ring = AudioRing(int(RING_SECONDS * SAMPLE_RATE))
 is_recording = False
-silence_start = None
+utterance_start = 0 # Ring position where the current utterance began
+silence_samples = 0 # Quiet samples since the last loud block
 
 def callback(indata, frames, time, status):
     """Called by sounddevice for each audio block."""
     if status:
         print(f"[WARN] {status}")
     audio_queue.put(indata.copy())
+    try:
+        wake_w.send(b"\0")
+    except OSError:
+        pass # Already signalled (buffer full) or shutting down
+
+def flush_utterance(end):
+    """Hands samples [utterance_start, end) to the transcription worker."""
+    global utterance_start
+    start = max(utterance_start, ring.written - ring.capacity)
+    if start != utterance_start:
+        print(f"\n[WARN] Backlog overran the capture ring, lost {start - utterance_start} samples")
+    # One copy per utterance: the ring keeps moving while Whisper works
+    enqueue_utterance(ring.read(start, end).copy())
+    utterance_start = end
 
 def main_loop():
-    global is_recording, silence_start, recording_buffer
+    global is_recording, utterance_start, silence_samples
     mute_until = 0 # [FIX] Initialize local variable
     
     # Start stream
     print(f"\n[EARS] Audio Devices:\n{sd.query_devices()}")
     
+    threading.Thread(target=transcription_worker, name="Transcriber", daemon=True).start()
+    
     with sd.InputStream(samplerate=SAMPLE_RATE, blocksize=BLOCK_SIZE, channels=1, callback=callback):
         print(f"\n[EARS] Listening on default mic sending to {HOST_IP}:{HOST_PORT}")
         print("[EARS] Level: [                    ]", end='\r')
+        last_report = time.time()
         
         while True:
+            # [NEW] Sleep until audio, a reply or a command arrives (no sleep-polling)
+            readable, _, _ = select.select([sock, cmd_sock, wake_r], [], [], 1.0)
+            if wake_r in readable:
+                try:
+                    while wake_r.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+
+            if time.time() - last_report > 60:
+                print(f"\n[EARS] {transcriber_report()}")
+                last_report = time.time()
+
             # 1. Check for incoming replies from SYNZ
             try:
                 data, addr = sock.recvfrom(4096)
@@ -84,18 +174,24 @@ def main_loop():
                 while not audio_queue.empty():
                     audio_queue.get()
                 print(f"\r[EARS] Zzz... ({int(mute_until - time.time())}s)", end="", flush=True)
-                time.sleep(0.1) # Small sleep to prevent busy-waiting
                 continue
 
-            # 4. Consuming audio chunks
-            while not audio_queue.empty():
-                chunk = audio_queue.get()
+            # 4. Consuming audio chunks: copy the whole drain into the ring, then measure it in one go
+            start = ring.written
+            while True:
+                try:
+                    ring.write(audio_queue.get_nowait())
+                except queue.Empty:
+                    break
+            end = ring.written
+            if end > start:
+                start = max(start, end - ring.capacity)
                 # Switch to RMS (Root Mean Square) for standard amplitude (0.0 to 1.0)
-                # chunk is (4000, 1), flatten it first
-                volume = np.sqrt(np.mean(chunk.flatten()**2))
+                volumes = np.concatenate([frame_rms(part) for part in ring.parts(start, end)])
                 
                 # Visual Meter
                 # RMS is usually very small. Noise ~0.001. Speech ~0.1
+                volume = volumes[-1] if len(volumes) else 0.0
                 bars = int(min(volume * 300, 20)) # Scale up for visibility
                 meter = "|" * bars + " " * (20 - bars)
                 status = "REC " if is_recording else "    "
@@ -103,32 +199,27 @@ def main_loop():
                 # [DEBUG] Show numeric value to help user tune threshold
                 print(f"[EARS] Vol:{volume:.4f} |{meter}| {status}", end='\r')
                 
-                # VAD Logic
-                if volume > THRESHOLD:
-                    if not is_recording:
-                         is_recording = True
-                    recording_buffer.append(chunk)
-                    silence_start = None # Reset silence timer
-                    recording_buffer.append(chunk)
-                    silence_start = None # Reset silence timer
-                elif is_recording:
-                    # We are in a recording session, but this chunk is silent
-                    recording_buffer.append(chunk)
-                    
-                    if silence_start is None:
-                        silence_start = time.time()
-                    elif time.time() - silence_start > SILENCE_DURATION:
-                         # Silence exceeded limit -> FLUSH
-                         # print("\n[EARS] Processing Speech...") 
-                         process_audio()
-                         
-                         # Reset
-                         recording_buffer = []
-                         is_recording = False
-                         silence_start = None
-                         # print("[EARS] Listening...")
-
-            time.sleep(0.01)
+                # VAD Logic (per block, positions instead of copies)
+                for k, volume in enumerate(volumes):
+                    block_end = start + (k + 1) * BLOCK_SIZE
+                    if volume > THRESHOLD:
+                        if not is_recording:
+                             is_recording = True
+                             utterance_start = block_end - BLOCK_SIZE
+                        silence_samples = 0 # Reset silence timer
+                    elif is_recording:
+                        # We are in a recording session, but this chunk is silent
+                        silence_samples += BLOCK_SIZE
+                        if silence_samples > SILENCE_DURATION * SAMPLE_RATE:
+                             # Silence exceeded limit -> FLUSH
+                             flush_utterance(block_end)
+                             
+                             # Reset
+                             is_recording = False
+                             silence_samples = 0
+                             continue
+                    if is_recording and block_end - utterance_start >= MAX_UTTERANCE * SAMPLE_RATE:
+                        flush_utterance(block_end) # Monologue: transcribe what we have, keep recording
 
 # --- Wake Word Config ---
 WAKE_WORDS = ["SYNZ", "SINS", "SINNS", "SINCE", "SENDS", "XINS", "SCENES", "SYNTH", "SINES", "SIGNS", "SIMS", "SENSE", "CINS", "ZEN", "WAKE UP SYNZ", "WAKE UP SINS", "WAKE UP", "WAKEUP"] # Common Whisper misinterpretations
@@ -139,11 +230,11 @@ last_interaction_time = 0
 last_transcription = ""
 last_transcription_time = 0
 
-def process_audio():
-    """Concatenates buffer and runs Whisper."""
+def process_audio(audio_data):
+    """Runs Whisper on one utterance (float32 samples). Called from the transcription worker."""
     global is_awake, last_interaction_time, last_transcription, last_transcription_time
     
-    if not recording_buffer:
+    if len(audio_data) == 0:
         return
 
     # Check Sleep Timeout
@@ -154,11 +245,6 @@ def process_audio():
     status_icon = "🟢" if is_awake else "🔴"
     print(f"\n[EARS] Digitizing sequence... {status_icon}        ")
 
-    # Flatten buffer
-    audio_data = np.concatenate(recording_buffer, axis=0).flatten()
-    
-    audio_data = audio_data.astype(np.float32)
-    
     # Transcribe
     try:
         # [FIX] condition_on_previous_text=False prevents the "looping" hallucination
@@ -208,6 +294,49 @@ def process_audio():
     except Exception as e:
         print(f"[ERROR] Transcription failed: {e}")
 
+# --- [NEW] Transcription Worker ---
+utterance_queue = queue.Queue(maxsize=UTTERANCE_QUEUE)
+stats_lock = threading.Lock()
+stats = {"utterances": 0, "dropped": 0, "audio_seconds": 0.0, "busy_seconds": 0.0, "rtf_max": 0.0, "depth_max": 0}
+
+def enqueue_utterance(audio):
+    """Never blocks the capture loop: when Whisper is too far behind, the oldest utterance goes."""
+    while True:
+        try:
+            utterance_queue.put_nowait(audio)
+            break
+        except queue.Full:
+            try:
+                utterance_queue.get_nowait()
+                with stats_lock:
+                    stats["dropped"] += 1
+                print("\n[WARN] Transcriber is behind, dropped the oldest utterance")
+            except queue.Empty:
+                pass
+    with stats_lock:
+        stats["depth_max"] = max(stats["depth_max"], utterance_queue.qsize())
+
+def transcription_worker():
+    while True:
+        audio = utterance_queue.get()
+        start = time.time()
+        process_audio(audio)
+        elapsed = time.time() - start
+        seconds = len(audio) / SAMPLE_RATE
+        rtf = elapsed / seconds if seconds else 0.0 # Real-time factor: < 1.0 keeps up with speech
+        with stats_lock:
+            stats["utterances"] += 1
+            stats["audio_seconds"] += seconds
+            stats["busy_seconds"] += elapsed
+            stats["rtf_max"] = max(stats["rtf_max"], rtf)
+        print(f"[EARS] {seconds:.1f}s of audio in {elapsed:.1f}s (RTF {rtf:.2f}, queued {utterance_queue.qsize()})")
+
+def transcriber_report():
+    with stats_lock:
+        rtf_avg = stats["busy_seconds"] / stats["audio_seconds"] if stats["audio_seconds"] else 0.0
+        return (f"transcriber: utterances={stats['utterances']} queue={utterance_queue.qsize()}/{UTTERANCE_QUEUE} "
+                f"(max {stats['depth_max']}) dropped={stats['dropped']} rtf avg={rtf_avg:.2f} max={stats['rtf_max']:.2f}")
+
 if __name__ == "__main__":
     try:
         main_loop()
@@ -0,0 +1,110 @@
+import heapq
+import itertools
+import threading
+import time
+
+# --- Priority Classes (lower runs first) ---
+PRIORITY_CHAT = 0  # A human is waiting
+PRIORITY_CODE = 1  # Code Watcher reviews
+PRIORITY_LOGS = 2  # Log Sentinel analysis
+
+class Job:
+    def __init__(self, kind, priority, payload):
+        self.kind = kind
+        self.priority = priority
+        self.payload = payload
+        self.enqueued_at = time.time()
+
+class JobScheduler:
+    """Priority job queue drained by ONE worker thread (the only thread that touches the model).
+
+    handlers:  kind -> fn(payload)
+    priorities: kind -> priority class
+    coalesce:  kind -> merge(old_payload, new_payload). While a job of that kind is still
+               waiting, new submissions are folded into it instead of queueing another LLM call.
+    """
+
+    def __init__(self, handlers, priorities, coalesce=None):
+        self.handlers = handlers
+        self.priorities = priorities
+        self.coalesce = coalesce or {}
+        self.heap = []
+        self.counter = itertools.count() # FIFO inside a priority class
+        self.waiting = {} # kind -> queued Job (only for coalescing kinds)
+        self.cond = threading.Condition()
+        self.worker = None
+        self.running = False
+        # Counters
+        self.stats = {kind: {"submitted": 0, "coalesced": 0, "done": 0, "failed": 0,
+                             "wait_total": 0.0, "wait_max": 0.0}
+                      for kind in handlers}
+
+    def submit(self, kind, payload):
+        with self.cond:
+            self.stats[kind]["submitted"] += 1
+            queued = self.waiting.get(kind)
+            if queued is not None:
+                queued.payload = self.coalesce[kind](queued.payload, payload)
+                self.stats[kind]["coalesced"] += 1
+                return queued
+            job = Job(kind, self.priorities[kind], payload)
+            heapq.heappush(self.heap, (job.priority, next(self.counter), job))
+            if kind in self.coalesce:
+                self.waiting[kind] = job
+            self.cond.notify()
+            return job
+
+    def depth(self, kind=None):
+        with self.cond:
+            return sum(1 for _, _, job in self.heap if kind is None or job.kind == kind)
+
+    def _next_job(self):
+        with self.cond:
+            while self.running and not self.heap:
+                self.cond.wait()
+            if not self.running:
+                return None
+            _, _, job = heapq.heappop(self.heap)
+            if self.waiting.get(job.kind) is job:
+                del self.waiting[job.kind] # From now on new submissions start a fresh job
+            wait = time.time() - job.enqueued_at
+            stats = self.stats[job.kind]
+            stats["wait_total"] += wait
+            stats["wait_max"] = max(stats["wait_max"], wait)
+            return job
+
+    def _run(self):
+        while self.running:
+            job = self._next_job()
+            if job is None:
+                break
+            try:
+                self.handlers[job.kind](job.payload)
+                self.stats[job.kind]["done"] += 1
+            except Exception as e:
+                self.stats[job.kind]["failed"] += 1
+                print(f"[SCHEDULER] {job.kind} job failed: {e}")
+
+    def start(self):
+        self.running = True
+        self.worker = threading.Thread(target=self._run, name="ModelWorker", daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def report(self):
+        """One line per job kind: queue depth, wait times, coalescing."""
+        lines = []
+        with self.cond:
+            depths = {}
+            for _, _, job in self.heap:
+                depths[job.kind] = depths.get(job.kind, 0) + 1
+            for kind, s in self.stats.items():
+                started = s["done"] + s["failed"]
+                avg_wait = s["wait_total"] / started if started else 0.0
+                lines.append(f"{kind}: depth={depths.get(kind, 0)} done={s['done']} failed={s['failed']} "
+                             f"coalesced={s['coalesced']} wait avg={avg_wait:.2f}s max={s['wait_max']:.2f}s")
+        return "\n".join(lines)
@@ -0,0 +1,125 @@
+import re
+import time
+import hashlib
+from collections import deque, OrderedDict
+
+# --- Unity Editor.log parsing ---
+# An error record starts on a line that names an error/exception and keeps going through its stack trace:
+#   NullReferenceException: Object reference not set to an instance of an object
+#   Player.Update () (at Assets/Scripts/Player.cs:42)
+#   Assets/Scripts/Player.cs(12,5): error CS1002: ; expected
+ERROR_START = re.compile(r"(Exception\b|\bError\b|\berror CS\d+|\bAssertion failed)", re.IGNORECASE)
+STACK_LINE = re.compile(r"^(\s+|at |UnityEngine\.|UnityEditor\.|System\.|\(Filename:|[\w.<>`+]+[:.][\w.<>`+]+ ?\(.*\)( \(at .*\))?$)")
+
+# --- Normalization (same error, different run -> same fingerprint) ---
+NORMALIZERS = [
+    (re.compile(r"0x[0-9a-fA-F]+"), "0x#"),                                     # Addresses
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<guid>"),
+    (re.compile(r"\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b"), "<hex>"),            # Bare hex ids / pointers
+    (re.compile(r"\d+"), "#"),                                                   # Line numbers, timestamps, instance ids
+]
+
+def normalize(line):
+    line = line.strip()
+    for pattern, replacement in NORMALIZERS:
+        line = pattern.sub(replacement, line)
+    return line
+
+def fingerprint(lines, frames=3):
+    """Header line + top stack frames, normalized and hashed."""
+    key = "\n".join(normalize(l) for l in lines[:1 + frames])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+class ErrorGroup:
+    def __init__(self, fp, sample):
+        self.fingerprint = fp
+        self.sample = sample      # Latest full record text (what the LLM gets to see)
+        self.times = deque()      # Occurrence timestamps inside the sliding window
+        self.pending = 0          # Occurrences since the last escalation
+        self.total = 0
+        self.last_escalated = None
+
+class LogSentinel:
+    """Turns raw Editor.log chunks into error records, groups them by fingerprint and
+    decides when a group is worth an LLM call (once per cooldown, with counts attached)."""
+
+    def __init__(self, window=60.0, cooldown=300.0, max_groups=512, settle=0.5):
+        self.window = window
+        self.cooldown = cooldown
+        self.max_groups = max_groups
+        self.settle = settle # Seconds without new log text before a trailing record counts as complete
+        self.groups = OrderedDict() # fingerprint -> ErrorGroup (LRU)
+        self.partial = ""   # Unfinished last line of the previous chunk
+        self.current = None # Record still collecting stack lines
+        self.last_text_at = 0.0 # When ingest() last got any text
+        self.records = 0
+        self.escalated = 0
+
+    def _finish(self, now):
+        if not self.current:
+            return
+        lines, self.current = self.current, None
+        fp = fingerprint(lines)
+        group = self.groups.get(fp)
+        if group is None:
+            group = self.groups[fp] = ErrorGroup(fp, "")
+            while len(self.groups) > self.max_groups:
+                self.groups.popitem(last=False)
+        else:
+            self.groups.move_to_end(fp)
+        group.sample = "\n".join(lines)
+        group.times.append(now)
+        group.pending += 1
+        group.total += 1
+        self.records += 1
+
+    def ingest(self, chunk, now=None):
+        """Feed newly appended log text. Returns how many complete error records it contained."""
+        now = now or time.time()
+        before = self.records
+        if chunk:
+            self.last_text_at = now
+        text = self.partial + chunk
+        lines = text.split("\n")
+        self.partial = lines.pop() # May be cut mid-line; finish it with the next chunk
+        for raw in lines:
+            line = raw.rstrip("\r")
+            is_header = bool(line.strip()) and not line[0].isspace() and "(at " not in line and ERROR_START.search(line)
+            if self.current is not None:
+                if not is_header and line.strip() and STACK_LINE.match(line) and len(self.current) < 40:
+                    self.current.append(line)
+                    continue
+                self._finish(now)
+            if is_header:
+                self.current = [line]
+        return self.records - before
+
+    def escalations(self, now=None):
+        """Groups that should go to the model now: seen since their last report and out of cooldown."""
+        now = now or time.time()
+        if now - self.last_text_at >= self.settle:
+            # The log went quiet -> a trailing record is complete. (A chunk ending on a line break
+            # isn't enough: Unity often flushes the header and its stack trace separately.)
+            self._finish(now)
+        ready = []
+        for group in self.groups.values():
+            while group.times and now - group.times[0] > self.window:
+                group.times.popleft()
+            if not group.pending:
+                continue
+            if group.last_escalated is not None and now - group.last_escalated < self.cooldown:
+                continue
+            ready.append({
+                "fingerprint": group.fingerprint,
+                "sample": group.sample,
+                "count": group.pending,         # Since the last escalation
+                "in_window": len(group.times),  # In the last `window` seconds
+                "total": group.total,
+            })
+            group.pending = 0
+            group.last_escalated = now
+            self.escalated += 1
+        return ready
+
+    def report(self):
+        return f"log sentinel: records={self.records} groups={len(self.groups)} escalated={self.escalated}"
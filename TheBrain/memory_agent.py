@@ -1,75 +1,340 @@
 import os
+import re
 import json
 import uuid
 import time
+import math
+import heapq
+import threading
 from collections import Counter
+from memory_index import KeywordIndex, tokenize
+from memory_store import STORES
+from memory_vectors import VectorIndex, make_embedder
+
+# --- Hybrid Recall ---
+VECTOR_WEIGHT = 0.6   # Share of the cosine score; the rest is BM25 squashed to 0..1
+KEYWORD_HALF = 2.0    # BM25 score that counts as "half" keyword evidence (s / (s + KEYWORD_HALF))
+# A memory with no keyword overlap needs at least this cosine to count. Hashing vectors of unrelated
+# text (shared trigrams, bucket collisions) mostly stay under 0.13; real matches score 0.15-0.65.
+MIN_SIMILARITY = 0.15
+
+# --- Consolidation ---
+DUPLICATE_SIMILARITY = 0.92 # Cosine (word overlap without vectors) above which two memories may be one
+HALF_LIFE_DAYS = 30.0       # Recency and recall hits fade with this half-life
+HIT_WEIGHT = 0.5            # Per log(1 + recall hits)
+REINFORCE_WEIGHT = 2.0      # One !good outweighs months of recency
+EVICT_TO = 0.95             # Over the cap, evict down to this fraction of it (not one per turn)
+# Exchanges where SYNZ said nothing worth keeping
+LOW_VALUE = re.compile(r"^SYNZ: (\.\.\.|I am listening\.|I am ready\.|My brain is offline\b.*)$", re.MULTILINE)
 
 # --- SAFETY WRAPPER ---
 # We try to import ChromaDB, but since we know it fails on 3.14, we prioritize the JSON fallback logic
 # if the import fails.
 
 class MemoryAgent:
-    def __init__(self, db_path="synz_memories.json"):
+    def __init__(self, db_path="synz_memories.json", storage="json", recall_mode="hybrid", embedder="hash",
+                 max_memories=5000):
         # Path resolution
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.json_path = os.path.join(script_dir, db_path)
+        self.index_path = os.path.splitext(self.json_path)[0] + ".index.json"
+        self.vectors_base = os.path.splitext(self.json_path)[0] # -> .vectors.f32 / .vectors.json
         self.mode = "JSON" # Force JSON mode for safety on this user's machine
+        # [NEW] "json" = rewrite synz_memories.json per memory, "journal" = append-only log + snapshots
+        self.store = STORES[storage](self.json_path)
         
         # Load existing
         self.memories = []
+        self.by_id = {}
+        self.index = KeywordIndex() # [NEW] term -> posting list, updated by remember()
+        # [NEW] "keyword" = BM25 only, "vector" = embeddings only, "hybrid" = both
+        # embedder: "hash" (offline feature hashing) or a local sentence-transformers folder
+        self.recall_mode = recall_mode
+        self.vectors = VectorIndex(make_embedder(embedder)) if recall_mode != "keyword" else None
+        # [NEW] Consolidation: bounded size, duplicates merged, importance-based eviction
+        self.max_memories = max_memories
+        self.lock = threading.RLock() # Face turns and the consolidation thread share everything below
+        self.dirty = set()  # Memories whose hit counts changed since they were last written
+        self.cursor = 0     # Where the next incremental duplicate scan starts
+        self.merged = 0
+        self.evicted = 0
+        self.stop_event = threading.Event()
         self.load_memories()
+        self.load_index()
 
-        print(f"[MEMORY] Hippocampus Loaded (JSON Mode). {len(self.memories)} memories stored.")
+        print(f"[MEMORY] Hippocampus Loaded (JSON Mode, {self.store.name} storage, {self.recall_mode} recall). {len(self.memories)} memories stored.")
 
     def load_memories(self):
-        if os.path.exists(self.json_path):
-            try:
-                with open(self.json_path, 'r', encoding='utf-8') as f:
-                    self.memories = json.load(f)
-            except Exception as e:
-                print(f"[MEMORY] Corrupt DB: {e}. Starting fresh.")
-                self.memories = []
+        self.memories = self.store.load()
+        self.by_id = {m['id']: m for m in self.memories}
 
-    def save_memories(self):
+    def load_index(self):
+        """Loads the saved index and patches it up to match the memories on disk."""
+        self.index.load(self.index_path)
+        # Journal deletes (forget, consolidation) don't rewrite the index: drop just those ids
+        stale = [doc_id for doc_id in self.index.doc_len if doc_id not in self.by_id]
+        for doc_id in stale:
+            self.index.remove(doc_id)
+        missing = [m for m in self.memories if m['id'] not in self.index]
+        for mem in missing:
+            self.index.add(mem['id'], mem['text'])
+        if missing:
+            print(f"[MEMORY] Indexed {len(missing)} memories.")
+
+        stale_vectors = False
+        if self.vectors is not None:
+            self.vectors.load(self.vectors_base)
+            stale_rows = [doc_id for doc_id in self.vectors.rows if doc_id not in self.by_id]
+            for doc_id in stale_rows:
+                self.vectors.remove(doc_id) # Dead rows, packed away by the next compaction
+            stale_vectors = bool(stale_rows)
+            # One batch for everything the matrix doesn't have yet
+            unembedded = [(m['id'], m['text']) for m in self.memories if m['id'] not in self.vectors]
+            self.vectors.add_many(unembedded)
+            if unembedded:
+                print(f"[MEMORY] Embedded {len(unembedded)} memories ({self.vectors.embedder.name}).")
+                stale_vectors = True
+
+        if stale or missing or stale_vectors:
+            self.save_index()
+
+    def save_index(self):
         try:
-            with open(self.json_path, 'w', encoding='utf-8') as f:
-                json.dump(self.memories, f, indent=2)
+            self.index.save(self.index_path)
+            if self.vectors is not None:
+                self.vectors.save(self.vectors_base)
         except Exception as e:
-            print(f"[ERR] Failed to save memory: {e}")
+            print(f"[ERR] Failed to save memory index: {e}")
+
+    def save_memories(self):
+        """Writes the full store (for the journal this is a compaction)."""
+        with self.lock:
+            self.dirty.clear() # A full write includes the hit counts
+            self.store.save(self.memories)
+            self.save_index()
+
+    def close(self):
+        """Stops consolidation and flushes pending journal writes. Call on shutdown."""
+        self.stop_event.set()
+        with self.lock:
+            self._flush_dirty()
+            self.store.close()
 
     def remember(self, text, metadata=None):
-        """Saves a thought to JSON."""
+        """Saves a thought to the store."""
         entry = {
             "id": str(uuid.uuid4()),
             "text": text,
             "metadata": metadata or {"source": "conversation", "timestamp": time.time()}
         }
-        self.memories.append(entry)
-        self.save_memories()
+        with self.lock:
+            self.memories.append(entry)
+            self.by_id[entry['id']] = entry
+            self.index.add(entry['id'], text)
+            if self.vectors is not None:
+                self.vectors.add(entry['id'], text) # Row goes straight into the memmap
+            # Journal: O(1) append. The index is only rewritten when the store does a full write.
+            if self.store.append(entry, self.memories):
+                self._store_rewritten()
+        return entry
 
-    def recall(self, query, n_results=2):
-        """Finds memories using Keyword Matches (dumb but fast)."""
-        if not self.memories:
-            return ""
+    def _store_rewritten(self):
+        """The store just wrote every memory (JSON save or journal compaction): pending hit counts
+        went with it, and the index is saved alongside."""
+        self.dirty.clear()
+        self.save_index()
+
+    def _persist(self, entry):
+        self.dirty.discard(entry['id'])
+        if self.store.update(entry, self.memories):
+            self._store_rewritten()
+
+    def _flush_dirty(self):
+        """Writes changed hit counts: one rewrite for JsonStore, one put per memory for the journal."""
+        entries = [self.by_id[doc_id] for doc_id in self.dirty if doc_id in self.by_id]
+        self.dirty.clear()
+        if entries and self.store.update_many(entries, self.memories):
+            self._store_rewritten()
+
+    def reinforce(self, text):
+        """!good feedback: the memory of that exchange becomes important (stored first if missing)."""
+        with self.lock:
+            entry = next((m for m in reversed(self.memories) if m['text'] == text), None)
+            if entry is None:
+                entry = self.remember(text)
+            meta = entry.setdefault("metadata", {})
+            meta["reinforced"] = meta.get("reinforced", 0) + 1
+            self._persist(entry)
+
+    def forget(self, doc_ids):
+        """Removes memories from the store and both indexes. Returns how many were removed."""
+        with self.lock:
+            doc_ids = set(doc_ids) & self.by_id.keys()
+            if not doc_ids:
+                return 0
+            for doc_id in doc_ids:
+                entry = self.by_id.pop(doc_id)
+                self.index.remove(doc_id, entry['text'])
+                if self.vectors is not None:
+                    self.vectors.remove(doc_id)
+                self.dirty.discard(doc_id)
+            self.memories = [m for m in self.memories if m['id'] not in doc_ids]
+            if self.store.delete(doc_ids, self.memories):
+                self._store_rewritten()
+            return len(doc_ids)
+
+    # --- Consolidation ---
+    def importance(self, entry, now=None):
+        """Recency + recall hits (both fading) + !good feedback. Low-value exchanges count a quarter."""
+        now = now or time.time()
+        meta = entry.get("metadata") or {}
+        age_days = max(0.0, now - meta.get("timestamp", now)) / 86400
+        score = 0.5 ** (age_days / HALF_LIFE_DAYS)
+        hits = meta.get("hits", 0)
+        if hits:
+            hit_age_days = max(0.0, now - meta.get("last_hit", now)) / 86400
+            score += HIT_WEIGHT * math.log1p(hits) * 0.5 ** (hit_age_days / HALF_LIFE_DAYS)
+        score += REINFORCE_WEIGHT * meta.get("reinforced", 0)
+        if LOW_VALUE.search(entry['text']):
+            score *= 0.25
+        return score
+
+    def _same_facts(self, a, b):
+        """Similar is not enough: one memory's words must all appear in the other. "room 3" vs "room 4"
+        or "Jordan" vs "Jamie" score high but are different facts, and merging would lose one."""
+        words, other_words = set(tokenize(self.by_id[a]['text'])), set(tokenize(self.by_id[b]['text']))
+        return words <= other_words or other_words <= words
+
+    def _duplicates(self, batch):
+        """(doc_id, other_id) pairs where `other` is a near-duplicate of a memory in `batch`."""
+        pairs = []
+        if self.vectors is not None:
+            for doc_id, neighbours in self.vectors.neighbours([m['id'] for m in batch]).items():
+                pairs.extend((doc_id, other) for score, other in neighbours
+                             if other != doc_id and score >= DUPLICATE_SIMILARITY and self._same_facts(doc_id, other))
+            return pairs
+        for mem in batch:
+            words = set(tokenize(mem['text']))
+            for _, other in self.index.search(mem['text'], 3):
+                if other == mem['id']:
+                    continue
+                other_words = set(tokenize(self.by_id[other]['text']))
+                if (words and len(words & other_words) / len(words | other_words) >= DUPLICATE_SIMILARITY
+                        and self._same_facts(mem['id'], other)):
+                    pairs.append((mem['id'], other))
+        return pairs
+
+    def _collapse(self, a, b, now, dropped):
+        """Keeps the more important of two duplicates, folding the other's history into it.
+        The loser goes into `dropped` (forgotten in one go at the end of the pass)."""
+        if a in dropped or b in dropped:
+            return False # Already merged away earlier in this pass
+        keep, drop = self.by_id[a], self.by_id[b]
+        if self.importance(drop, now) > self.importance(keep, now):
+            keep, drop = drop, keep
+        kept_meta = keep.setdefault("metadata", {})
+        dropped_meta = drop.get("metadata") or {}
+        kept_meta["hits"] = kept_meta.get("hits", 0) + dropped_meta.get("hits", 0)
+        kept_meta["last_hit"] = max(kept_meta.get("last_hit", 0), dropped_meta.get("last_hit", 0))
+        kept_meta["reinforced"] = kept_meta.get("reinforced", 0) + dropped_meta.get("reinforced", 0)
+        kept_meta["timestamp"] = max(kept_meta.get("timestamp", 0), dropped_meta.get("timestamp", 0))
+        kept_meta["merged"] = kept_meta.get("merged", 0) + 1 + dropped_meta.get("merged", 0)
+        self.dirty.add(keep['id'])
+        dropped.add(drop['id'])
+        return True
+
+    def consolidate_step(self, batch_size=64):
+        """One incremental pass: scan the next `batch_size` memories for near-duplicates, write
+        changed hit counts, evict down to the cap. Returns (merged, evicted) for this step."""
+        with self.lock:
+            now = time.time()
+            merged = evicted = 0
+            if self.memories:
+                if self.cursor >= len(self.memories):
+                    self.cursor = 0 # Wrap around: memories merged into keep changing
+                batch = self.memories[self.cursor:self.cursor + batch_size]
+                self.cursor += batch_size
+                dropped = set()
+                for a, b in self._duplicates(batch):
+                    merged += self._collapse(a, b, now, dropped)
+                self.forget(dropped)
+
+            self._flush_dirty() # With JsonStore, forget() already wrote these
+
+            if len(self.memories) > self.max_memories:
+                excess = len(self.memories) - int(self.max_memories * EVICT_TO)
+                victims = heapq.nsmallest(excess, self.memories, key=lambda m: self.importance(m, now))
+                evicted = self.forget([m['id'] for m in victims])
+
+            if self.vectors is not None and self.vectors.dead_rows > max(len(self.vectors), 64):
+                self.vectors.compact(self.vectors_base) # Removed rows still cost mat-vec time
+
+            self.merged += merged
+            self.evicted += evicted
+            return merged, evicted
+
+    def start_consolidation(self, interval=15.0, batch_size=64):
+        """Runs consolidate_step() every `interval` seconds on a daemon thread until close()."""
+        def loop():
+            while not self.stop_event.wait(interval):
+                try:
+                    merged, evicted = self.consolidate_step(batch_size)
+                    if merged or evicted:
+                        print(f"[MEMORY] Consolidated: merged {merged}, evicted {evicted}. {self.report()}")
+                except Exception as e:
+                    print(f"[MEMORY] Consolidation failed: {e}")
+        threading.Thread(target=loop, name="MemoryConsolidation", daemon=True).start()
+
+    def report(self):
+        return f"memory: {len(self.memories)}/{self.max_memories} stored, merged={self.merged} evicted={self.evicted}"
+
+    def search(self, query, n_results=2):
+        """Returns [(score, memory id), ...] best first, using the configured recall mode."""
+        with self.lock:
+            return self._search(query, n_results)
+
+    def _search(self, query, n_results):
+        if self.vectors is None:
+            # Only the posting lists of the query words are scanned, top N kept in a heap
+            return self.index.search(query, n_results)
+
+        candidates = max(5 * n_results, 10)
+        query_vector = self.vectors.embedder.embed([query])[0]
+        dense = self.vectors.search(query, candidates, query_vector=query_vector)
+        if self.recall_mode == "vector":
+            return [(score, doc_id) for score, doc_id in dense[:n_results] if score >= MIN_SIMILARITY]
+
+        sparse = self.index.search(query, candidates)
+        # Saturating instead of dividing by the best hit: one weak "the" match must not count as 1.0
+        keyword = {doc_id: score / (score + KEYWORD_HALF) for score, doc_id in sparse}
+        cosine = {doc_id: score for score, doc_id in dense}
+        # Keyword hits outside the dense top-k still get their exact cosine (one small mat-vec)
+        cosine.update(self.vectors.similarity(query_vector, [d for d in keyword if d not in cosine]))
 
-        # 1. Simple Keyword Scoring
-        query_words = set(query.lower().split())
         scored = []
-        
-        for mem in self.memories:
-            mem_text = mem['text']
-            mem_words = set(mem_text.lower().split())
-            
-            # Intersection count
-            overlap = len(query_words.intersection(mem_words))
-            if overlap > 0:
-                scored.append((overlap, mem_text))
-        
-        # 2. Sort by overlap
-        scored.sort(key=lambda x: x[0], reverse=True)
-        
-        # 3. Take top N
-        top_memories = [x[1] for x in scored[:n_results]]
+        for doc_id in keyword.keys() | cosine.keys():
+            kw = keyword.get(doc_id, 0.0)
+            cos = cosine.get(doc_id, 0.0)
+            if kw == 0.0 and cos < MIN_SIMILARITY:
+                continue
+            scored.append((VECTOR_WEIGHT * cos + (1 - VECTOR_WEIGHT) * kw, doc_id))
+        return heapq.nlargest(n_results, scored)
+
+    def recall(self, query, n_results=2):
+        """Finds memories by BM25 keywords, embedding similarity, or both (recall_mode)."""
+        with self.lock:
+            if not self.memories:
+                return ""
+
+            hits = self._search(query, n_results)
+            top_memories = [self.by_id[doc_id]['text'] for _, doc_id in hits]
+            # Recall hits feed importance (written lazily by the next consolidation step)
+            now = time.time()
+            for _, doc_id in hits:
+                meta = self.by_id[doc_id].setdefault("metadata", {})
+                meta["hits"] = meta.get("hits", 0) + 1
+                meta["last_hit"] = now
+                self.dirty.add(doc_id)
         
         if not top_memories:
             return ""
@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import math
+import heapq
+from collections import Counter
+
+# Words only. "name?" and "name" must be the same term.
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+class KeywordIndex:
+    """Inverted index (term -> {memory id: term frequency}) with BM25 scoring.
+    Recall only touches the posting lists of the query terms, not every memory."""
+
+    def __init__(self, k1=1.5, b=0.75, max_df_ratio=0.5, min_docs_for_cutoff=50):
+        self.k1 = k1
+        self.b = b
+        # Terms in more than half of all memories ("user", "synz", "the") carry almost no
+        # signal but have the longest posting lists -> skip them once the store is big enough.
+        self.max_df_ratio = max_df_ratio
+        self.min_docs_for_cutoff = min_docs_for_cutoff
+        self.postings = {} # term -> {doc_id: tf}
+        self.doc_len = {}  # doc_id -> number of terms
+        self.total_len = 0
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_len
+
+    def add(self, doc_id, text):
+        if doc_id in self.doc_len:
+            self.remove(doc_id) # The old text's terms aren't known here (rare: ids are fresh uuids)
+        terms = Counter(tokenize(text))
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        length = sum(terms.values())
+        self.doc_len[doc_id] = length
+        self.total_len += length
+
+    def remove(self, doc_id, text=None):
+        """text finds the posting lists directly; without it (a stale id whose memory is already
+        gone) every posting list is checked."""
+        if doc_id not in self.doc_len:
+            return
+        terms = set(tokenize(text)) if text is not None else list(self.postings)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[term]
+        self.total_len -= self.doc_len.pop(doc_id)
+
+    def clear(self):
+        self.postings = {}
+        self.doc_len = {}
+        self.total_len = 0
+
+    def search(self, query, n_results=2):
+        """Returns [(score, doc_id), ...] best first."""
+        n_docs = len(self.doc_len)
+        if n_docs == 0:
+            return []
+        avg_len = self.total_len / n_docs
+        k1, b = self.k1, self.b
+
+        scores = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            if n_docs >= self.min_docs_for_cutoff and df > self.max_df_ratio * n_docs:
+                continue
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in posting.items():
+                norm = tf + k1 * (1 - b + b * self.doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / norm
+
+        if not scores:
+            return []
+        best = heapq.nlargest(n_results, scores.items(), key=lambda kv: kv[1])
+        return [(score, doc_id) for doc_id, score in best]
+
+    # --- Persistence ---
+    def save(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "doc_len": self.doc_len, "postings": self.postings}, f)
+        os.replace(tmp_path, path) # Atomic, a crash never leaves half an index
+
+    def load(self, path):
+        """Returns False (and stays empty) if the file is missing or unreadable."""
+        self.clear()
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != 1:
+                return False
+            self.doc_len = data["doc_len"]
+            self.postings = data["postings"]
+            self.total_len = sum(self.doc_len.values())
+            return True
+        except Exception as e:
+            print(f"[MEMORY] Index unreadable ({e}). Rebuilding.")
+            self.clear()
+            return False
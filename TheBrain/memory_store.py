@@ -0,0 +1,196 @@
+import os
+import json
+import time
+
+# --- Storage Backends for the Hippocampus ---
+# JsonStore:    the original single synz_memories.json (whole file rewritten per memory)
+# JournalStore: snapshot + append-only JSONL journal (one line per memory, compacted now and then)
+
+def _atomic_write_json(path, data, indent=None):
+    """Writes to a temp file and swaps it in, so a crash never leaves half a file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _read_json_list(path):
+    """Reads a JSON list of memories. A corrupt file is moved aside instead of being overwritten."""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        corrupt_path = f"{path}.{int(time.time())}.corrupt"
+        print(f"[MEMORY] Corrupt DB: {e}. Moved to {os.path.basename(corrupt_path)}, starting fresh.")
+        try: os.replace(path, corrupt_path)
+        except OSError: pass
+        return []
+
+class JsonStore:
+    name = "JSON"
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        return _read_json_list(self.path)
+
+    def append(self, entry, memories):
+        """Returns True when the whole store was written (callers piggyback index saves on it)."""
+        self.save(memories)
+        return True
+
+    def update(self, entry, memories):
+        self.save(memories)
+        return True
+
+    def update_many(self, entries, memories):
+        """One rewrite covers every changed entry."""
+        self.save(memories)
+        return True
+
+    def delete(self, doc_ids, memories):
+        self.save(memories)
+        return True
+
+    def save(self, memories):
+        try:
+            _atomic_write_json(self.path, memories, indent=2)
+        except Exception as e:
+            print(f"[ERR] Failed to save memory: {e}")
+
+    def close(self):
+        pass
+
+class JournalStore:
+    name = "Journal"
+
+    def __init__(self, path, fsync_every=8, fsync_interval=2.0, compact_every=500):
+        base = os.path.splitext(path)[0]
+        self.legacy_path = path # The old synz_memories.json, only read for migration
+        self.snapshot_path = base + ".snapshot.json"
+        self.journal_path = base + ".journal.jsonl"
+        self.fsync_every = fsync_every       # fsync after this many records...
+        self.fsync_interval = fsync_interval # ...or once this many seconds passed
+        self.compact_every = compact_every   # fold the journal into the snapshot after N records
+        self.journal = None
+        self.unsynced = 0
+        self.last_sync = time.time()
+        self.records = 0 # Records in the journal since the last compaction
+
+    def load(self):
+        if not os.path.exists(self.snapshot_path) and not os.path.exists(self.journal_path):
+            if os.path.exists(self.legacy_path):
+                migrate_json_to_journal(self.legacy_path, self)
+
+        memories = {m['id']: m for m in _read_json_list(self.snapshot_path)}
+        self.records = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn write from a crash (only ever the last line). Everything before it is fine.
+                        print(f"[MEMORY] Skipping damaged journal record at line {line_no}.")
+                        continue
+                    op = record.get("op")
+                    if op in ("add", "put"): # put = same memory, changed metadata (hits, !good)
+                        entry = record["entry"]
+                        memories[entry['id']] = entry
+                    elif op == "del":
+                        for doc_id in record["ids"]:
+                            memories.pop(doc_id, None)
+                    self.records += 1
+        return list(memories.values())
+
+    def append(self, entry, memories):
+        return self._write({"op": "add", "entry": entry}, memories)
+
+    def update(self, entry, memories):
+        return self._write({"op": "put", "entry": entry}, memories)
+
+    def update_many(self, entries, memories):
+        wrote = False
+        for entry in entries:
+            wrote = self._write({"op": "put", "entry": entry}, memories) or wrote
+        return wrote
+
+    def delete(self, doc_ids, memories):
+        return self._write({"op": "del", "ids": list(doc_ids)}, memories)
+
+    def _write(self, record, memories):
+        if self.journal is None:
+            self.journal = self._open_journal()
+        self.journal.write(json.dumps(record) + "\n")
+        self.journal.flush()
+        self.records += 1
+        self.unsynced += 1
+        if self.unsynced >= self.fsync_every or time.time() - self.last_sync >= self.fsync_interval:
+            self.sync()
+        if self.records >= self.compact_every:
+            self.save(memories)
+            return True
+        return False
+
+    def _open_journal(self):
+        journal = open(self.journal_path, 'a', encoding='utf-8')
+        if journal.tell() > 0:
+            # A torn last record has no newline; start on a fresh line so the next record survives
+            with open(self.journal_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    journal.write("\n")
+        return journal
+
+    def sync(self):
+        if self.journal is not None and self.unsynced:
+            os.fsync(self.journal.fileno())
+        self.unsynced = 0
+        self.last_sync = time.time()
+
+    def save(self, memories):
+        """Compaction: write a fresh snapshot, then empty the journal."""
+        try:
+            _atomic_write_json(self.snapshot_path, memories)
+            # Snapshot is durable now, the journal records are redundant
+            if self.journal is not None:
+                self.journal.close()
+            self.journal = open(self.journal_path, 'w', encoding='utf-8')
+            self.records = 0
+            self.unsynced = 0
+            self.last_sync = time.time()
+        except Exception as e:
+            print(f"[ERR] Failed to compact memory: {e}")
+
+    def close(self):
+        if self.journal is not None:
+            self.sync()
+            self.journal.close()
+            self.journal = None
+
+def migrate_json_to_journal(json_path, store=None):
+    """One-shot import of an old synz_memories.json into the journal layout. The JSON file is left alone."""
+    store = store or JournalStore(json_path)
+    memories = _read_json_list(json_path)
+    _atomic_write_json(store.snapshot_path, memories)
+    print(f"[MEMORY] Migrated {len(memories)} memories from {os.path.basename(json_path)} to journal storage.")
+    return store
+
+STORES = {"json": JsonStore, "journal": JournalStore}
+
+if __name__ == "__main__":
+    # Manual migration: python memory_store.py [synz_memories.json]
+    import sys
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(script_dir, "synz_memories.json"))
+    store = JournalStore(path)
+    if os.path.exists(store.snapshot_path) or os.path.exists(store.journal_path):
+        print("[MEMORY] Journal storage already exists. Nothing to migrate.")
+    else:
+        migrate_json_to_journal(path, store)
@@ -0,0 +1,228 @@
+import os
+import json
+import zlib
+
+import numpy as np
+
+from memory_index import tokenize
+
+# Glue words only add noise to hashed vectors (they'd collide with everything)
+STOPWORDS = frozenset("a an the is are was were be been am i you he she it we they me my your our their "
+                      "of to in on at for with and or but so do does did what whats which who how s t"
+                      # Speaker labels: every stored exchange is "User: ...\nSYNZ: ...", they only dilute it
+                      " user synz".split())
+
+# --- Embedders (offline, CPU only) ---
+class HashingEmbedder:
+    """Feature-hashing embedder: words plus character trigrams, signed-hashed into `dim` buckets.
+    No model, no network, stable across runs (crc32, not Python's salted hash()).
+    Trigrams make "name"/"names"/"name's" land close to each other."""
+
+    def __init__(self, dim=256, trigram_weight=0.5):
+        self.dim = dim
+        self.trigram_weight = trigram_weight
+        self.name = f"hash-{dim}-v2" # (v2: speaker labels ignored; a new name re-embeds saved matrices)
+
+    def _features(self, text):
+        for word in tokenize(text):
+            if word in STOPWORDS:
+                continue
+            yield word, 1.0
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3], self.trigram_weight
+
+    def embed(self, texts):
+        """Returns a (len(texts), dim) float32 matrix of unit rows (all-zero rows for empty text)."""
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode('utf-8'))
+                out[row, h % self.dim] += weight if h & 0x80000000 else -weight
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+class SentenceEmbedder:
+    """Optional: a sentence-transformers model from a local folder (e.g. all-MiniLM-L6-v2)."""
+
+    def __init__(self, model_path):
+        from sentence_transformers import SentenceTransformer # Lazy, heavy and optional
+        self.model = SentenceTransformer(model_path, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{os.path.basename(os.path.normpath(model_path))}-{self.dim}"
+
+    def embed(self, texts):
+        return np.asarray(self.model.encode(list(texts), normalize_embeddings=True, batch_size=32), dtype=np.float32)
+
+def make_embedder(spec="hash"):
+    """'hash' or 'hash-<dim>' -> HashingEmbedder, anything else is a local sentence model path.
+    Falls back to hashing if the model can't be loaded."""
+    if spec.startswith("hash"):
+        dim = int(spec.split("-")[1]) if "-" in spec else 256
+        return HashingEmbedder(dim)
+    try:
+        return SentenceEmbedder(spec)
+    except Exception as e:
+        print(f"[MEMORY] Sentence model unavailable ({e}). Using hashing embedder.")
+        return HashingEmbedder()
+
+# --- Vector Index ---
+class VectorIndex:
+    """Embeddings in one contiguous float32 matrix, memory-mapped from `<base>.vectors.f32`.
+    Search is a single matrix-vector product over all rows + argpartition for the top k.
+    Row order / ids live in `<base>.vectors.json` (written by save())."""
+
+    def __init__(self, embedder, min_rows=64):
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.min_rows = min_rows
+        self.matrix = None
+        self.matrix_path = None
+        self.ids = []      # row -> doc id (None = removed)
+        self.rows = {}     # doc id -> row
+        self.alive = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.rows
+
+    def _map(self, capacity):
+        """(Re)maps the matrix file with room for `capacity` rows."""
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None # Must be unmapped before the file can grow (Windows)
+        size = capacity * self.dim * 4
+        with open(self.matrix_path, 'r+b' if os.path.exists(self.matrix_path) else 'w+b') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < size:
+                f.truncate(size)
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self.alive)] = self.alive[:capacity]
+        self.alive = alive
+
+    def clear(self):
+        self.ids = []
+        self.rows = {}
+        self.alive[:] = False
+
+    def add_many(self, items):
+        """items: [(doc_id, text), ...]. Embeds them in one batch."""
+        items = [(doc_id, text) for doc_id, text in items if doc_id not in self.rows]
+        if not items:
+            return
+        needed = len(self.ids) + len(items)
+        if needed > len(self.matrix):
+            self._map(max(needed, 2 * len(self.matrix)))
+        vectors = self.embedder.embed([text for _, text in items])
+        start = len(self.ids)
+        self.matrix[start:start + len(items)] = vectors
+        for offset, (doc_id, _) in enumerate(items):
+            self.rows[doc_id] = start + offset
+            self.ids.append(doc_id)
+        self.alive[start:start + len(items)] = True
+
+    def add(self, doc_id, text):
+        self.add_many([(doc_id, text)])
+
+    def remove(self, doc_id):
+        row = self.rows.pop(doc_id, None)
+        if row is not None:
+            self.ids[row] = None
+            self.alive[row] = False
+
+    def neighbours(self, doc_ids, k=3):
+        """Nearest stored memories for several stored memories at once (one matrix-matrix product).
+        Returns {doc_id: [(cosine, other_id), ...]} (the memory itself is usually first)."""
+        pairs = [(d, self.rows[d]) for d in doc_ids if d in self.rows]
+        if not pairs:
+            return {}
+        count = len(self.ids)
+        scores = np.asarray(self.matrix[:count] @ self.matrix[[row for _, row in pairs]].T) # (count, batch)
+        scores[~self.alive[:count]] = -np.inf
+        k = min(k, len(self.rows))
+        top = np.argpartition(-scores, k - 1, axis=0)[:k] # (k, batch)
+        result = {}
+        for col, (doc_id, _) in enumerate(pairs):
+            rows = top[:, col]
+            rows = rows[np.argsort(-scores[rows, col])]
+            result[doc_id] = [(float(scores[row, col]), self.ids[row]) for row in rows]
+        return result
+
+    @property
+    def dead_rows(self):
+        return len(self.ids) - len(self.rows)
+
+    def compact(self, base_path):
+        """Packs live rows to the front after many removals. The row table on disk is removed first,
+        so a crash mid-way means a re-embed on the next start, never ids pointing at wrong rows."""
+        live = np.flatnonzero(self.alive[:len(self.ids)])
+        try: os.remove(base_path + ".vectors.json")
+        except OSError: pass
+        self.matrix[:len(live)] = self.matrix[live]
+        self.ids = [self.ids[row] for row in live]
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self.alive[:] = False
+        self.alive[:len(live)] = True
+        self.save(base_path)
+
+    def similarity(self, query_vector, doc_ids):
+        """Cosine of the query against specific memories (for hybrid re-scoring)."""
+        pairs = [(d, self.rows[d]) for d in doc_ids if d in self.rows]
+        if not pairs:
+            return {}
+        scores = self.matrix[[row for _, row in pairs]] @ query_vector
+        return {d: float(score) for (d, _), score in zip(pairs, scores)}
+
+    def search(self, query, n_results=2, query_vector=None):
+        """Returns [(cosine, doc_id), ...] best first."""
+        count = len(self.ids)
+        if not self.rows:
+            return []
+        if query_vector is None:
+            query_vector = self.embedder.embed([query])[0]
+        scores = np.asarray(self.matrix[:count] @ query_vector)
+        scores[~self.alive[:count]] = -np.inf
+        k = min(n_results, len(self.rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[row]), self.ids[row]) for row in top]
+
+    # --- Persistence ---
+    def save(self, base_path):
+        self.matrix.flush()
+        meta_path = base_path + ".vectors.json"
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "embedder": self.embedder.name, "dim": self.dim, "ids": self.ids}, f)
+        os.replace(tmp_path, meta_path)
+
+    def load(self, base_path):
+        """Maps the matrix file and restores the row table. Returns False (empty index) if the
+        metadata is missing, unreadable or from a different embedder."""
+        self.matrix_path = base_path + ".vectors.f32"
+        self.clear()
+        ok = False
+        try:
+            with open(base_path + ".vectors.json", 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("version") == 1 and meta.get("embedder") == self.embedder.name and meta.get("dim") == self.dim:
+                self.ids = meta["ids"]
+                ok = True
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[MEMORY] Vector index unreadable ({e}). Rebuilding.")
+        stored_rows = os.path.getsize(self.matrix_path) // (self.dim * 4) if os.path.exists(self.matrix_path) else 0
+        if ok and stored_rows < len(self.ids):
+            ok = False # Matrix file shorter than the table says
+        if not ok:
+            self.ids = []
+        self._map(max(self.min_rows, len(self.ids), stored_rows if ok else 0))
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids) if doc_id is not None}
+        self.alive[:] = False
+        self.alive[list(self.rows.values())] = True
+        return ok
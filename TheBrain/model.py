@@ -1,8 +1,32 @@
 # 🧠 NanoSYNZ Model Definition (Complete)
+import os
+import re
+import json
+import warnings
+import weakref
+import threading
 import torch
 import torch.nn as nn
 from torch.nn import functional as F
 
+def padding_attention_mask(key_mask, T):
+    """key_mask (B,L): False = padding, covering the cache AND the T new tokens.
+    Returns the (B,T,L) causal + padding mask for those T queries."""
+    L = key_mask.shape[1]
+    causal = torch.ones(T, L, dtype=torch.bool, device=key_mask.device).tril(diagonal=L - T)
+    # A padding query would see nothing at all (softmax over all -inf = NaN): let it see itself
+    diagonal = causal & ~torch.ones(T, L, dtype=torch.bool, device=key_mask.device).tril(diagonal=L - T - 1)
+    return (causal & key_mask[:, None, :]) | diagonal
+
+# [NEW] The KV cache lives on the attention modules, so one model runs one generation at a time.
+# (Kept off the model itself: a Lock attribute would break deepcopy, e.g. in quantize_dynamic.)
+_generation_locks = weakref.WeakKeyDictionary()
+_generation_locks_guard = threading.Lock()
+
+def generation_lock(model):
+    with _generation_locks_guard:
+        return _generation_locks.setdefault(model, threading.Lock())
+
 class Head(nn.Module):
     """ one head of self-attention """
 
@@ -13,16 +37,39 @@ class Head(nn.Module):
         self.value = nn.Linear(n_embed, head_size, bias=False)
         self.register_buffer('tril', torch.tril(torch.ones(block_size, block_size)))
         self.dropout = nn.Dropout(0.1)
+        # [NEW] KV Cache (only filled during incremental decoding)
+        self.cache_k = None
+        self.cache_v = None
 
-    def forward(self, x):
+    def reset_cache(self):
+        self.cache_k = None
+        self.cache_v = None
+
+    def select_cache(self, rows, start=0):
+        """Keeps cache rows `rows` and the columns from `start` on (batched generation)."""
+        self.cache_k = self.cache_k[rows, start:]
+        self.cache_v = self.cache_v[rows, start:]
+
+    def forward(self, x, use_cache=False, attn_mask=None):
         B,T,C = x.shape
         k = self.key(x)   # (B,T,hs)
         q = self.query(x) # (B,T,hs)
-        wei = q @ k.transpose(-2, -1) * k.shape[-1]**-0.5 # (B, T, hs) @ (B, hs, T) -> (B, T, T)
-        wei = wei.masked_fill(self.tril[:T, :T] == 0, float('-inf'))
+        v = self.value(x)
+        if use_cache:
+            # Prepend everything we have already seen, then remember the lot
+            if self.cache_k is not None:
+                k = torch.cat((self.cache_k, k), dim=1) # (B,L,hs)
+                v = torch.cat((self.cache_v, v), dim=1)
+            self.cache_k, self.cache_v = k, v
+        L = k.shape[1] # L == T unless we are decoding from the cache
+        wei = q @ k.transpose(-2, -1) * k.shape[-1]**-0.5 # (B, T, hs) @ (B, hs, L) -> (B, T, L)
+        if attn_mask is not None:
+            wei = wei.masked_fill(~attn_mask, float('-inf')) # (B,T,L), causal + padding
+        else:
+            # The T new queries sit at positions L-T..L-1
+            wei = wei.masked_fill(self.tril[L-T:L, :L] == 0, float('-inf'))
         wei = F.softmax(wei, dim=-1)
         wei = self.dropout(wei)
-        v = self.value(x) 
         out = wei @ v 
         return out
 
@@ -35,12 +82,70 @@ class MultiHeadAttention(nn.Module):
         self.proj = nn.Linear(head_size * num_heads, n_embed)
         self.dropout = nn.Dropout(0.1)
 
-    def forward(self, x):
-        out = torch.cat([h(x) for h in self.heads], dim=-1)
+    def forward(self, x, use_cache=False, attn_mask=None):
+        out = torch.cat([h(x, use_cache, attn_mask) for h in self.heads], dim=-1)
         out = self.proj(out)
         out = self.dropout(out)
         return out
 
+class CausalSelfAttention(nn.Module):
+    """ [NEW] all heads of self-attention in one fused kernel """
+
+    def __init__(self, num_heads, head_size, n_embed, block_size):
+        super().__init__()
+        # One projection for q, k and v of every head (instead of 3 * num_heads small ones)
+        self.c_attn = nn.Linear(n_embed, 3 * head_size * num_heads, bias=False)
+        self.proj = nn.Linear(head_size * num_heads, n_embed)
+        self.dropout = nn.Dropout(0.1)
+        self.num_heads = num_heads
+        self.head_size = head_size
+        self.cache_k = None
+        self.cache_v = None
+
+    def reset_cache(self):
+        self.cache_k = None
+        self.cache_v = None
+
+    def select_cache(self, rows, start=0):
+        self.cache_k = self.cache_k[rows, :, start:]
+        self.cache_v = self.cache_v[rows, :, start:]
+
+    def forward(self, x, use_cache=False, attn_mask=None):
+        if use_cache:
+            out, self.cache_k, self.cache_v = self.attend(x, self.cache_k, self.cache_v, attn_mask)
+            return out
+        return self.attend(x, attn_mask=attn_mask)[0]
+
+    def attend(self, x, past_k=None, past_v=None, attn_mask=None):
+        """Stateless attention: the cache is passed in and returned, k/v = past + new (B,nh,L,hs).
+        forward() keeps it on the module; the ONNX graphs pass it explicitly."""
+        B,T,C = x.shape
+        nh, hs = self.num_heads, self.head_size
+        q, k, v = self.c_attn(x).split(nh * hs, dim=2)
+        q = q.view(B, T, nh, hs).transpose(1, 2) # (B,nh,T,hs)
+        k = k.view(B, T, nh, hs).transpose(1, 2)
+        v = v.view(B, T, nh, hs).transpose(1, 2)
+        if past_k is not None:
+            k = torch.cat((past_k, k), dim=2) # (B,nh,L,hs)
+            v = torch.cat((past_v, v), dim=2)
+        L = k.shape[2]
+        dropout_p = self.dropout.p if self.training else 0.0
+        if attn_mask is not None:
+            # Batched generation: causal + padding mask, shared by all heads
+            out = F.scaled_dot_product_attention(q, k, v, attn_mask=attn_mask.unsqueeze(1), dropout_p=dropout_p)
+        elif L == T:
+            out = F.scaled_dot_product_attention(q, k, v, dropout_p=dropout_p, is_causal=True)
+        elif T == 1:
+            # A single new query may look at everything in the cache
+            out = F.scaled_dot_product_attention(q, k, v, dropout_p=dropout_p)
+        else:
+            # Several new queries on top of a cache: queries sit at positions L-T..L-1
+            mask = torch.ones(T, L, dtype=torch.bool, device=x.device).tril(diagonal=L - T)
+            out = F.scaled_dot_product_attention(q, k, v, attn_mask=mask, dropout_p=dropout_p)
+        out = out.transpose(1, 2).contiguous().view(B, T, nh * hs) # heads side by side, same as torch.cat
+        out = self.dropout(self.proj(out))
+        return out, k, v
+
 class FeedFoward(nn.Module):
     """ a simple linear layer followed by a non-linearity """
 
@@ -59,41 +164,77 @@ class FeedFoward(nn.Module):
 class Block(nn.Module):
     """ Transformer block: communication followed by computation """
 
-    def __init__(self, n_embed, n_head, block_size):
+    def __init__(self, n_embed, n_head, block_size, fused=False):
         super().__init__()
         head_size = n_embed // n_head
-        self.sa = MultiHeadAttention(n_head, head_size, n_embed, block_size)
+        attention = CausalSelfAttention if fused else MultiHeadAttention
+        self.sa = attention(n_head, head_size, n_embed, block_size)
         self.ffwd = FeedFoward(n_embed)
         self.ln1 = nn.LayerNorm(n_embed)
         self.ln2 = nn.LayerNorm(n_embed)
 
-    def forward(self, x):
-        x = x + self.sa(self.ln1(x))
+    def forward(self, x, use_cache=False, attn_mask=None):
+        x = x + self.sa(self.ln1(x), use_cache, attn_mask)
         x = x + self.ffwd(self.ln2(x))
         return x
 
+    def forward_stateless(self, x, past_k=None, past_v=None, attn_mask=None):
+        """forward() with the KV cache passed in and returned (fused attention only, used by the ONNX graphs)."""
+        out, k, v = self.sa.attend(self.ln1(x), past_k, past_v, attn_mask)
+        x = x + out
+        x = x + self.ffwd(self.ln2(x))
+        return x, k, v
+
 class NanoSYNZ(nn.Module):
     """ The Brain itself """
 
-    def __init__(self, vocab_size, n_embed, block_size, n_head, n_layer):
+    def __init__(self, vocab_size, n_embed, block_size, n_head, n_layer, fused=False):
         super().__init__()
         self.token_embedding_table = nn.Embedding(vocab_size, n_embed)
         self.position_embedding_table = nn.Embedding(block_size, n_embed)
         self.blocks = nn.Sequential(*[
-            Block(n_embed, n_head, block_size) for _ in range(n_layer)
+            Block(n_embed, n_head, block_size, fused) for _ in range(n_layer)
         ])
         self.ln_f = nn.LayerNorm(n_embed) # final layer norm
         self.lm_head = nn.Linear(n_embed, vocab_size)
         self.block_size = block_size
+        self.cache_pos = 0 # [NEW] How many positions the KV cache holds
+        # [NEW] When the window is full, generation continues from the last rollover_keep tokens.
+        # Position embeddings are absolute, so a full window can't slide one token inside the cache;
+        # keeping 3/4 means one re-prefill every block_size/4 tokens instead of one per token.
+        self.rollover_keep = block_size * 3 // 4
+        self.fused = fused
+
+    def reset_cache(self):
+        """Forgets every cached key/value (call before a fresh prompt)."""
+        self.cache_pos = 0
+        for m in self.modules():
+            if isinstance(m, (Head, CausalSelfAttention)):
+                m.reset_cache()
+
+    def select_cache(self, rows, start=0):
+        """Keeps only the cached keys/values of batch `rows`, from column `start` on."""
+        for m in self.modules():
+            if isinstance(m, (Head, CausalSelfAttention)):
+                m.select_cache(rows, start)
 
-    def forward(self, idx, targets=None):
+    def forward(self, idx, targets=None, use_cache=False, positions=None, key_mask=None):
         B, T = idx.shape
 
         # idx and targets are both (B,T) tensor of integers
+        # With the cache on, idx only holds the NEW tokens, so positions start where the cache ends
+        start = self.cache_pos if use_cache else 0
         tok_emb = self.token_embedding_table(idx) # (B,T,C)
-        pos_emb = self.position_embedding_table(torch.arange(T, device=idx.device)) # (T,C)
+        if positions is None:
+            pos_emb = self.position_embedding_table(torch.arange(start, start + T, device=idx.device)) # (T,C)
+        else:
+            pos_emb = self.position_embedding_table(positions) # (B,T,C): left-padded rows start at 0 late
         x = tok_emb + pos_emb # (B,T,C)
-        x = self.blocks(x) # (B,T,C)
+        attn_mask = padding_attention_mask(key_mask, T) if key_mask is not None else None
+        for block in self.blocks:
+            x = block(x, use_cache, attn_mask) # (B,T,C)
+        if use_cache:
+            self.cache_pos += T
         x = self.ln_f(x) # (B,T,C)
         logits = self.lm_head(x) # (B,T,vocab_size)
 
@@ -107,11 +248,16 @@ class NanoSYNZ(nn.Module):
 
         return logits, loss
 
-    def generate(self, idx, max_new_tokens):
+    @torch.no_grad()
+    def generate(self, idx, max_new_tokens, use_cache=True):
         # idx is (B, T) array of indices in the current context
+        if use_cache:
+            with generation_lock(self):
+                return self._generate_cached(idx, max_new_tokens)
+        start = max(0, idx.shape[1] - self.block_size) # Where the context window begins
         for _ in range(max_new_tokens):
-            # crop idx to the last block_size tokens
-            idx_cond = idx[:, -self.block_size:]
+            # crop idx to the current window (at most block_size tokens, see rollover_keep)
+            idx_cond = idx[:, start:]
             # get the predictions
             logits, loss = self(idx_cond)
             # focus only on the last time step
@@ -122,4 +268,303 @@ class NanoSYNZ(nn.Module):
             idx_next = torch.multinomial(probs, num_samples=1) # (B, 1)
             # append sampled index to the running sequence
             idx = torch.cat((idx, idx_next), dim=1) # (B, T+1)
+            if idx.shape[1] - start > self.block_size:
+                start = idx.shape[1] - self.rollover_keep
+        return idx
+
+    def _generate_cached(self, idx, max_new_tokens):
+        """Same sampling as generate(), but only the newest token goes through the blocks."""
+        self.reset_cache()
+        # Prefill with the (cropped) prompt
+        idx_cond = idx[:, -self.block_size:]
+        try:
+            for _ in range(max_new_tokens):
+                logits, _ = self(idx_cond, use_cache=True)
+                logits = logits[:, -1, :] # (B, C)
+                probs = F.softmax(logits, dim=-1)
+                idx_next = torch.multinomial(probs, num_samples=1) # (B, 1)
+                idx = torch.cat((idx, idx_next), dim=1)
+
+                if self.cache_pos >= self.block_size:
+                    # Roll over: the window moves, so every position embedding shifts.
+                    # Cached keys/values are stale now -> rebuild from the last rollover_keep tokens,
+                    # exactly like the uncached path does (the next block_size/4 steps are cached again).
+                    self.reset_cache()
+                    idx_cond = idx[:, -self.rollover_keep:]
+                else:
+                    idx_cond = idx_next
+        finally:
+            self.reset_cache()
         return idx
+
+    # --- [NEW] Batched Generation ---
+    def _left_pad(self, rows, device):
+        """Token lists -> (idx, key_mask, positions), all (B, longest). Padding goes on the left so
+        every row's next token lands in the same (last) column."""
+        T = max(len(row) for row in rows)
+        idx = torch.zeros(len(rows), T, dtype=torch.long, device=device)
+        key_mask = torch.zeros(len(rows), T, dtype=torch.bool, device=device)
+        for b, row in enumerate(rows):
+            if row:
+                idx[b, T - len(row):] = torch.tensor(row, dtype=torch.long, device=device)
+                key_mask[b, T - len(row):] = True
+        positions = (key_mask.cumsum(dim=1) - 1).clamp(min=0)
+        return idx, key_mask, positions
+
+    @torch.no_grad()
+    def generate_batch(self, prompts, max_new_tokens, stop_tokens=(), return_scores=False):
+        """Samples continuations for several prompts (lists of token ids, any lengths) at once.
+
+        One forward pass per step for the whole batch. A row stops at its first token in
+        `stop_tokens` (not included in the output) or after max_new_tokens; finished rows leave
+        the batch and the KV cache. Returns a list of new-token lists (and with return_scores,
+        each row's mean log-probability too, e.g. to pick the best of N samples).
+        Safe to call from several threads: calls on the same model take turns."""
+        with generation_lock(self):
+            return self._generate_batch(prompts, max_new_tokens, stop_tokens, return_scores)
+
+    def _generate_batch(self, prompts, max_new_tokens, stop_tokens, return_scores):
+        device = self.token_embedding_table.weight.device # (lm_head may be int8, see quantize_int8)
+        stop_tokens = set(stop_tokens)
+        history = [list(prompt) for prompt in prompts] # Everything each row has seen (for roll-over)
+        outputs = [[] for _ in prompts]
+        scores = [0.0] * len(prompts)
+        active = [b for b in range(len(prompts)) if history[b] and max_new_tokens > 0] # batch row -> prompt
+        self.reset_cache()
+        try:
+            if active:
+                idx, key_mask, positions = self._left_pad([history[b][-self.block_size:] for b in active], device)
+            while active:
+                logits, _ = self(idx, use_cache=True, positions=positions, key_mask=key_mask)
+                probs = F.softmax(logits[:, -1, :], dim=-1) # (B, C)
+                idx_next = torch.multinomial(probs, num_samples=1) # (B, 1)
+                picked = probs.gather(1, idx_next).log().squeeze(1).tolist() if return_scores else None
+
+                keep = []
+                for row, (b, token) in enumerate(zip(active, idx_next.squeeze(1).tolist())):
+                    if return_scores:
+                        scores[b] += picked[row]
+                    history[b].append(token)
+                    if token in stop_tokens:
+                        continue
+                    outputs[b].append(token)
+                    if len(outputs[b]) < max_new_tokens:
+                        keep.append(row)
+                if len(keep) < len(active):
+                    active = [active[row] for row in keep]
+                    if not active:
+                        break
+                    rows = torch.tensor(keep, device=device)
+                    idx_next, key_mask = idx_next[rows], key_mask[rows]
+                    # Columns that are now padding in every remaining row are dead weight
+                    start = int(key_mask.any(dim=0).long().argmax())
+                    key_mask = key_mask[:, start:]
+                    self.select_cache(rows, start)
+
+                if key_mask.shape[1] >= self.block_size:
+                    # Roll over exactly like _generate_cached: rebuild from each row's last rollover_keep tokens
+                    self.reset_cache()
+                    idx, key_mask, positions = self._left_pad([history[b][-self.rollover_keep:] for b in active], device)
+                else:
+                    positions = key_mask.sum(dim=1, keepdim=True) # New token goes right after the row's real ones
+                    key_mask = torch.cat((key_mask, torch.ones_like(idx_next, dtype=torch.bool)), dim=1)
+                    idx = idx_next
+        finally:
+            self.reset_cache()
+        if return_scores:
+            return outputs, [score / max(1, len(history[b]) - len(prompts[b])) for b, score in enumerate(scores)]
+        return outputs
+
+# --- [NEW] Checkpoint Conversion (per-Head -> fused) ---
+_HEAD_KEY = re.compile(r'^(.*\.sa)\.heads\.(\d+)\.(key|query|value|tril)(\.weight)?$')
+
+def fuse_state_dict(state_dict):
+    """Converts a per-Head checkpoint (old synz_face.pth) into the fused c_attn layout.
+    Already-fused checkpoints pass through unchanged."""
+    fused = {}
+    layers = {} # "blocks.0.sa" -> {"query": {head: weight}, ...}
+    for name, tensor in state_dict.items():
+        match = _HEAD_KEY.match(name)
+        if not match:
+            fused[name] = tensor
+            continue
+        prefix, head, kind = match.group(1), int(match.group(2)), match.group(3)
+        if kind == 'tril':
+            continue # SDPA does the causal mask itself
+        layers.setdefault(prefix, {}).setdefault(kind, {})[head] = tensor
+
+    for prefix, kinds in layers.items():
+        # Heads stacked in order -> matches the (B,T,nh,hs) reshape in CausalSelfAttention
+        q, k, v = [torch.cat([kinds[kind][h] for h in sorted(kinds[kind])], dim=0)
+                   for kind in ('query', 'key', 'value')]
+        fused[f'{prefix}.c_attn.weight'] = torch.cat((q, k, v), dim=0)
+    return fused
+
+def load_checkpoint(model, path, map_location='cpu'):
+    """Loads synz_face.pth into either layout, converting old checkpoints for fused models."""
+    state_dict = torch.load(path, map_location=map_location)
+    if model.fused:
+        state_dict = fuse_state_dict(state_dict)
+    model.load_state_dict(state_dict)
+    return model
+
+# --- [NEW] Int8 Inference (CPU) ---
+def quantize_int8(model):
+    """Dynamic int8 quantization of every nn.Linear (attention projections, FeedFoward, lm_head):
+    weights stored as int8, activations quantized on the fly. Embeddings and LayerNorms stay fp32.
+    Returns a new model for inference only."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore") # torch.ao deprecation notice, the API still works
+        return torch.ao.quantization.quantize_dynamic(model.eval(), {nn.Linear}, dtype=torch.qint8)
+
+@torch.no_grad()
+def validation_loss(model, tokens, block_size=None, batch_size=32, max_blocks=256):
+    """Mean next-token cross-entropy over consecutive, non-overlapping windows of `tokens`
+    (deterministic, so fp32 and int8 see exactly the same text)."""
+    block_size = block_size or model.block_size
+    starts = list(range(0, len(tokens) - block_size - 1, block_size))[:max_blocks]
+    if not starts:
+        return None
+    model.eval()
+    total = 0.0
+    for i in range(0, len(starts), batch_size):
+        batch = starts[i:i + batch_size]
+        x = torch.stack([tokens[s:s + block_size] for s in batch])
+        y = torch.stack([tokens[s + 1:s + block_size + 1] for s in batch])
+        _, loss = model(x, y)
+        total += loss.item() * len(batch)
+    return total / len(starts)
+
+def load_quantized(model, path, cache_path=None, val_tokens=None, map_location='cpu'):
+    """fp32 checkpoint -> int8 model, with the quantized state dict cached next to it
+    (default: synz_face.int8.pt). The cache is reused while the checkpoint and model shape are unchanged.
+
+    val_tokens (tensor, or a function returning one) is only needed when the cache is rebuilt: the
+    validation loss of both versions is measured then and stored with the cache.
+    Returns (int8 model, {"fp32_val_loss", "int8_val_loss"})."""
+    cache_path = cache_path or os.path.splitext(path)[0] + ".int8.pt"
+    stat = os.stat(path)
+    source = [stat.st_mtime_ns, stat.st_size]
+    shapes = {name: list(t.shape) for name, t in model.state_dict().items()}
+    try:
+        cached = torch.load(cache_path, map_location=map_location)
+        if cached["source"] == source and cached["shapes"] == shapes:
+            qmodel = quantize_int8(model)
+            qmodel.load_state_dict(cached["state_dict"])
+            return qmodel, cached["info"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[INT8] Cache unreadable ({e}). Re-quantizing.")
+
+    load_checkpoint(model, path, map_location=map_location)
+    qmodel = quantize_int8(model)
+    info = {"fp32_val_loss": None, "int8_val_loss": None}
+    if callable(val_tokens):
+        val_tokens = val_tokens()
+    if val_tokens is not None:
+        info["fp32_val_loss"] = validation_loss(model, val_tokens)
+        info["int8_val_loss"] = validation_loss(qmodel, val_tokens)
+    tmp_path = cache_path + ".tmp"
+    torch.save({"source": source, "shapes": shapes, "info": info, "state_dict": qmodel.state_dict()}, tmp_path)
+    os.replace(tmp_path, cache_path)
+    return qmodel, info
+
+def describe_quantization(info):
+    """'val loss 1.2345 -> 1.2400 (+0.45%)' for logs."""
+    fp32, int8 = info.get("fp32_val_loss"), info.get("int8_val_loss")
+    if fp32 is None or int8 is None:
+        return "val loss not measured"
+    return f"val loss {fp32:.4f} -> {int8:.4f} ({100 * (int8 - fp32) / fp32:+.2f}%)"
+
+# --- [NEW] ONNX Export (served by onnx_backend.OnnxSYNZ, no torch needed there) ---
+# Two fixed-shape graphs (only the batch is dynamic):
+#   prefill: left-padded prompts (B, block_size) -> last logits + the keys/values of every position
+#   decode:  one token per row on top of a block_size-slot cache buffer (past_mask = which slots are used)
+# The caller owns the cache buffer and writes each step's new key/value column into it.
+ONNX_PREFILL = "synz_prefill.onnx"
+ONNX_DECODE = "synz_decode.onnx"
+ONNX_META = "synz_onnx.json"
+
+class PrefillGraph(nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, idx, positions, key_mask):
+        m = self.model
+        x = m.token_embedding_table(idx) + m.position_embedding_table(positions)
+        attn_mask = padding_attention_mask(key_mask, idx.shape[1])
+        keys, values = [], []
+        for block in m.blocks:
+            x, k, v = block.forward_stateless(x, attn_mask=attn_mask)
+            keys.append(k)
+            values.append(v)
+        logits = m.lm_head(m.ln_f(x[:, -1])) # (B, vocab)
+        return logits, torch.stack(keys), torch.stack(values) # (n_layer,B,nh,block_size,hs)
+
+class DecodeGraph(nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, token, position, past_mask, past_k, past_v):
+        m = self.model
+        x = m.token_embedding_table(token) + m.position_embedding_table(position) # (B,1,C)
+        attn_mask = padding_attention_mask(torch.cat((past_mask, torch.ones_like(past_mask[:, :1])), dim=1), 1)
+        keys, values = [], []
+        for layer, block in enumerate(m.blocks):
+            x, k, v = block.forward_stateless(x, past_k[layer], past_v[layer], attn_mask)
+            keys.append(k[:, :, -1:])
+            values.append(v[:, :, -1:])
+        logits = m.lm_head(m.ln_f(x[:, -1]))
+        return logits, torch.stack(keys), torch.stack(values) # new column only: (n_layer,B,nh,1,hs)
+
+def _fused_copy(model):
+    """Export works on the fused layout; per-Head models are converted first."""
+    if model.fused:
+        return model
+    n_embed = model.token_embedding_table.embedding_dim
+    copy = NanoSYNZ(model.token_embedding_table.num_embeddings, n_embed, model.block_size,
+                    len(model.blocks[0].sa.heads), len(model.blocks), fused=True)
+    copy.load_state_dict(fuse_state_dict(model.state_dict()))
+    return copy
+
+def export_onnx(model, out_dir, source_path=None, opset_version=18):
+    """Writes the prefill and decode graphs plus synz_onnx.json (shapes, and which checkpoint
+    they came from so onnx_backend can tell when a re-export is due)."""
+    model = _fused_copy(model).eval()
+    os.makedirs(out_dir, exist_ok=True)
+    attn = model.blocks[0].sa
+    n_layer, nh, hs, S = len(model.blocks), attn.num_heads, attn.head_size, model.block_size
+    batch = torch.export.Dim("batch", min=1, max=256)
+
+    idx = torch.zeros(2, S, dtype=torch.long)
+    key_mask = torch.ones(2, S, dtype=torch.bool)
+    positions = torch.arange(S).expand(2, S).contiguous()
+    # Every example input is its own tensor: torch.export traces a tensor passed twice as ONE input
+    token = torch.zeros(2, 1, dtype=torch.long)
+    position = torch.ones(2, 1, dtype=torch.long)
+    past_mask = torch.ones(2, S, dtype=torch.bool)
+    past_k = torch.zeros(n_layer, 2, nh, S, hs)
+    past_v = torch.ones(n_layer, 2, nh, S, hs)
+    graphs = [
+        (ONNX_PREFILL, PrefillGraph(model).eval(), (idx, positions, key_mask),
+         ["idx", "positions", "key_mask"], ({0: batch}, {0: batch}, {0: batch})),
+        (ONNX_DECODE, DecodeGraph(model).eval(), (token, position, past_mask, past_k, past_v),
+         ["token", "position", "past_mask", "past_k", "past_v"], ({0: batch}, {0: batch}, {0: batch}, {1: batch}, {1: batch})),
+    ]
+    with torch.no_grad():
+        for name, graph, args, input_names, dynamic_shapes in graphs:
+            torch.onnx.export(graph, args, os.path.join(out_dir, name), input_names=input_names,
+                              output_names=["logits", "k", "v"], dynamic_shapes=dynamic_shapes,
+                              opset_version=opset_version, dynamo=True, external_data=False)
+
+    meta = {"version": 1, "block_size": S, "n_layer": n_layer, "n_head": nh, "head_size": hs,
+            "vocab_size": model.lm_head.out_features, "rollover_keep": model.rollover_keep, "source": None}
+    if source_path:
+        stat = os.stat(source_path)
+        meta["source"] = [stat.st_mtime_ns, stat.st_size]
+    with open(os.path.join(out_dir, ONNX_META), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return meta
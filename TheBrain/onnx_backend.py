@@ -0,0 +1,131 @@
+import os
+import json
+import numpy as np
+
+# --- ONNX Runtime Personality Backend ---
+# Serves NanoSYNZ from the graphs written by model.export_onnx(): numpy + onnxruntime only,
+# no torch import and no Python module tree in the per-token loop.
+# Same interface as the torch model where the Face uses it (generate_batch).
+
+ONNX_PREFILL = "synz_prefill.onnx" # (Same names as model.py, which needs torch to import)
+ONNX_DECODE = "synz_decode.onnx"
+ONNX_META = "synz_onnx.json"
+
+def export_is_current(export_dir, checkpoint_path):
+    """True if the exported graphs exist and came from this exact checkpoint file."""
+    try:
+        with open(os.path.join(export_dir, ONNX_META), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        stat = os.stat(checkpoint_path)
+    except (OSError, ValueError):
+        return False
+    return (meta.get("source") == [stat.st_mtime_ns, stat.st_size]
+            and all(os.path.exists(os.path.join(export_dir, name)) for name in (ONNX_PREFILL, ONNX_DECODE)))
+
+def _softmax(logits):
+    logits = logits.astype(np.float64)
+    logits -= logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    return probs / probs.sum(axis=1, keepdims=True)
+
+class OnnxSYNZ:
+    """NanoSYNZ on onnxruntime's CPU provider.
+
+    threads: intra-op pool size (the matmuls). Inter-op parallelism is off: the graphs are one chain,
+    and a second pool would only compete with the Face's other threads."""
+
+    def __init__(self, export_dir, threads=4, seed=None):
+        import onnxruntime as ort # Only this backend needs it
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        self.prefill = ort.InferenceSession(os.path.join(export_dir, ONNX_PREFILL), options, providers=providers)
+        self.decode = ort.InferenceSession(os.path.join(export_dir, ONNX_DECODE), options, providers=providers)
+        with open(os.path.join(export_dir, ONNX_META), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.block_size = meta["block_size"]
+        self.n_layer, self.n_head, self.head_size = meta["n_layer"], meta["n_head"], meta["head_size"]
+        self.vocab_size = meta["vocab_size"]
+        self.rollover_keep = meta.get("rollover_keep", self.block_size * 3 // 4) # Same as NanoSYNZ
+        self.rng = np.random.default_rng(seed)
+
+    def _prefill(self, rows):
+        """Runs the (cropped, left-padded) prompts. Returns logits and a cache buffer whose first
+        L = longest-prompt slots hold the prompt keys (left-padded), the rest is free."""
+        S = self.block_size
+        idx = np.zeros((len(rows), S), dtype=np.int64)
+        key_mask = np.zeros((len(rows), S), dtype=bool)
+        for b, row in enumerate(rows):
+            if row:
+                idx[b, S - len(row):] = row
+                key_mask[b, S - len(row):] = True
+        positions = np.maximum(key_mask.cumsum(axis=1) - 1, 0).astype(np.int64)
+        logits, keys, values = self.prefill.run(None, {"idx": idx, "positions": positions, "key_mask": key_mask})
+        # The graph is fixed at S columns: move the used ones to the front, the rest become free slots
+        L = max(len(row) for row in rows)
+        keys[:, :, :, :L] = keys[:, :, :, S - L:]
+        values[:, :, :, :L] = values[:, :, :, S - L:]
+        key_mask[:, :L] = key_mask[:, S - L:]
+        key_mask[:, L:] = False
+        return logits, keys, values, key_mask, L
+
+    def logits(self, prompts):
+        """Next-token logits (B, vocab) for each prompt (parity checks)."""
+        return self._prefill([list(p)[-self.block_size:] for p in prompts])[0]
+
+    def generate_batch(self, prompts, max_new_tokens, stop_tokens=(), return_scores=False):
+        """Same contract as NanoSYNZ.generate_batch (sampling uses numpy's RNG, not torch's)."""
+        stop_tokens = set(stop_tokens)
+        history = [list(prompt) for prompt in prompts]
+        outputs = [[] for _ in prompts]
+        scores = [0.0] * len(prompts)
+        active = [b for b in range(len(prompts)) if history[b] and max_new_tokens > 0]
+        if active:
+            logits, keys, values, key_mask, L = self._prefill([history[b][-self.block_size:] for b in active])
+        while active:
+            probs = _softmax(logits)
+            draws = self.rng.random((len(active), 1))
+            tokens = np.minimum((probs.cumsum(axis=1) < draws).sum(axis=1), self.vocab_size - 1)
+
+            keep = []
+            for row, (b, token) in enumerate(zip(active, tokens.tolist())):
+                if return_scores:
+                    scores[b] += float(np.log(probs[row, token]))
+                history[b].append(token)
+                if token in stop_tokens:
+                    continue
+                outputs[b].append(token)
+                if len(outputs[b]) < max_new_tokens:
+                    keep.append(row)
+            if len(keep) < len(active):
+                active = [active[row] for row in keep]
+                if not active:
+                    break
+                tokens, keys, values, key_mask = tokens[keep], keys[:, keep], values[:, keep], key_mask[keep]
+                # Slots that are now padding in every remaining row are dead weight
+                start = int(key_mask[:, :L].any(axis=0).argmax())
+                if start:
+                    keys[:, :, :, :L - start] = keys[:, :, :, start:L]
+                    values[:, :, :, :L - start] = values[:, :, :, start:L]
+                    key_mask[:, :L - start] = key_mask[:, start:L]
+                    key_mask[:, L - start:] = False
+                    L -= start
+
+            if L >= self.block_size:
+                # Roll over exactly like the torch path: rebuild from each row's last rollover_keep tokens
+                logits, keys, values, key_mask, L = self._prefill([history[b][-self.rollover_keep:] for b in active])
+            else:
+                positions = key_mask.sum(axis=1, keepdims=True).astype(np.int64)
+                logits, new_k, new_v = self.decode.run(None, {
+                    "token": tokens[:, None].astype(np.int64), "position": positions,
+                    "past_mask": key_mask, "past_k": keys, "past_v": values})
+                keys[:, :, :, L] = new_k[:, :, :, 0]
+                values[:, :, :, L] = new_v[:, :, :, 0]
+                key_mask[:, L] = True
+                L += 1
+        if return_scores:
+            return outputs, [score / max(1, len(history[b]) - len(prompts[b])) for b, score in enumerate(scores)]
+        return outputs
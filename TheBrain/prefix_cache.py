@@ -0,0 +1,117 @@
+import os
+import glob
+import time
+import pickle
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Llama-3 chat layout (same as llama_cpp's "llama-3" chat_format). Everything up to the end of the
+# system turn is identical for every chat packet the Face sends, so its KV state can be reused.
+LLAMA3_SYSTEM_PREFIX = "<|start_header_id|>system<|end_header_id|>\n\n{system}<|eot_id|>"
+
+class PrefixEntry:
+    def __init__(self, tokens, state, eval_seconds):
+        self.tokens = tokens
+        self.state = state               # llama_cpp LlamaState right after the prefix
+        self.eval_seconds = eval_seconds # What evaluating the prefix from scratch cost
+
+class PrefixStateCache:
+    """Saves the evaluated KV state of known prompt prefixes (RAM + disk) and restores it before a chat.
+
+    Llama.generate() already skips any leading tokens that match what is in the KV cache, so putting
+    the prefix state back in place is all it takes for the system prompt to cost nothing.
+    Files are keyed by model (path, size, mtime), context params and a hash of the prefix tokens.
+    """
+
+    def __init__(self, llm, model_path, cache_dir, n_ctx, n_gpu_layers=0, max_entries=4):
+        self.llm = llm
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+        stat = os.stat(model_path)
+        model_id = f"{os.path.abspath(model_path)}|{stat.st_size}|{int(stat.st_mtime)}|ctx={n_ctx}|gpu={n_gpu_layers}"
+        self.model_key = hashlib.sha256(model_id.encode('utf-8')).hexdigest()[:16]
+        self.entries = OrderedDict() # prefix hash -> PrefixEntry (LRU order)
+        # Stats
+        self.hits = 0      # Restored from the cache
+        self.resident = 0  # Prefix was still in the KV cache, nothing to do
+        self.misses = 0    # Evaluated from scratch (and saved)
+        self.time_saved = 0.0
+
+    def _path(self, prefix_hash):
+        return os.path.join(self.cache_dir, f"{self.model_key}_{prefix_hash}.state")
+
+    def load_from_disk(self):
+        """Startup: pull every saved prefix for this model/context into RAM and make the newest one live."""
+        paths = sorted(glob.glob(os.path.join(self.cache_dir, f"{self.model_key}_*.state")), key=os.path.getmtime)
+        for path in paths[-self.max_entries:]:
+            try:
+                with open(path, 'rb') as f:
+                    entry = pickle.load(f)
+                prefix_hash = os.path.basename(path)[len(self.model_key) + 1:-len(".state")]
+                self.entries[prefix_hash] = entry
+            except Exception as e:
+                print(f"[PREFIX] Dropping unreadable cache file {os.path.basename(path)}: {e}")
+                try: os.remove(path)
+                except OSError: pass
+        if self.entries:
+            newest = next(reversed(self.entries.values()))
+            self.llm.load_state(newest.state)
+        return len(self.entries)
+
+    def prefix_tokens(self, system_prompt):
+        text = LLAMA3_SYSTEM_PREFIX.format(system=system_prompt)
+        return self.llm.tokenize(text.encode('utf-8'), add_bos=True, special=True)
+
+    def prepare(self, messages):
+        """Call right before create_chat_completion(messages)."""
+        if not messages or messages[0].get("role") != "system":
+            return
+        tokens = self.prefix_tokens(messages[0]["content"])
+        prefix_hash = hashlib.sha256(str(tokens).encode('utf-8')).hexdigest()[:16]
+        entry = self.entries.get(prefix_hash)
+
+        n = len(tokens)
+        if self.llm.n_tokens >= n and list(self.llm.input_ids[:n]) == tokens:
+            self.resident += 1
+            if entry:
+                self.time_saved += entry.eval_seconds
+            return
+
+        if entry:
+            start = time.time()
+            self.llm.load_state(entry.state)
+            self.entries.move_to_end(prefix_hash)
+            self.hits += 1
+            self.time_saved += max(0.0, entry.eval_seconds - (time.time() - start))
+            return
+
+        # Miss: evaluate the prefix now (the completion would have anyway) and keep the result
+        self.misses += 1
+        start = time.time()
+        self.llm.reset()
+        self.llm.eval(tokens)
+        eval_seconds = time.time() - start
+        state = self.llm.save_state()
+        # Logits of prefix tokens are never read again (generate() always re-evaluates the last
+        # prompt token), and the full score matrix is hundreds of MB for a 128k vocab.
+        state.scores = np.zeros((1, 1), dtype=np.single)
+        entry = PrefixEntry(tokens, state, eval_seconds)
+        self.entries[prefix_hash] = entry
+        while len(self.entries) > self.max_entries:
+            old_hash, _ = self.entries.popitem(last=False)
+            try: os.remove(self._path(old_hash))
+            except OSError: pass
+        try:
+            tmp_path = self._path(prefix_hash) + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f)
+            os.replace(tmp_path, self._path(prefix_hash))
+        except Exception as e:
+            print(f"[PREFIX] Could not save prefix state: {e}")
+
+    def report(self):
+        return (f"prefix cache: hits={self.hits} resident={self.resident} misses={self.misses} "
+                f"saved={self.time_saved:.1f}s")
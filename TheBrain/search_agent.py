@@ -1,27 +1,170 @@
-from duckduckgo_search import DDGS 
+import os
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+
+# --- Backends ---
+# Anything with .text(query, max_results) -> [{"title", "href", "body"}, ...] works.
+
+class DDGSBackend:
+    """DuckDuckGo (the original behaviour). Imported on first use so tests need no network package."""
+    name = "ddgs"
 
-class SearchAgent:
     def __init__(self):
-        self.ddgs = DDGS()
-    
+        self.ddgs = None
+
+    def text(self, query, max_results=3):
+        if self.ddgs is None:
+            from duckduckgo_search import DDGS
+            self.ddgs = DDGS()
+        return self.ddgs.text(query, max_results=max_results)
+
+class FixtureBackend:
+    """Canned results from a dict or JSON file ({normalized query: [results]}), for tests and benchmarks.
+    `latency` fakes network time so cache gains can be measured offline."""
+    name = "fixture"
+
+    def __init__(self, fixtures=None, latency=0.0):
+        if isinstance(fixtures, str):
+            with open(fixtures, 'r', encoding='utf-8') as f:
+                fixtures = json.load(f)
+        self.fixtures = {normalize_query(q): r for q, r in (fixtures or {}).items()}
+        self.latency = latency
+        self.calls = 0
+
+    def text(self, query, max_results=3):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.fixtures.get(normalize_query(query), [])[:max_results]
+
+def normalize_query(query):
+    """'What's the WEATHER today?' and 'whats the weather today' are the same search."""
+    query = re.sub(r"[^\w\s]", "", query.lower())
+    return " ".join(query.split())
+
+# --- Result Cache ---
+class SearchCache:
+    """LRU of search results with a TTL, optionally persisted to a JSON file (so restarts keep it)."""
+
+    def __init__(self, ttl=900.0, max_entries=256, path=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = OrderedDict() # key -> [expires_at, results] (LRU order)
+        if path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"[Search] Cache file unreadable ({e}). Starting empty.")
+            return
+        now = time.time()
+        for key, expires_at, results in stored:
+            if expires_at > now:
+                self.entries[key] = [expires_at, results]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump([[key, expires_at, results] for key, (expires_at, results) in self.entries.items()], f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self.entries[key] # Stale: news and weather move on
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, results):
+        with self.lock:
+            self.entries[key] = [time.time() + self.ttl, results]
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            if self.path:
+                try:
+                    self._save() # Rare (one per real search), and the search itself cost far more
+                except OSError as e:
+                    print(f"[Search] Could not persist cache: {e}")
+
+    def __len__(self):
+        return len(self.entries)
+
+class SearchAgent:
+    def __init__(self, backend=None, cache_ttl=900.0, cache_size=256, cache_path=None):
+        self.backend = backend or DDGSBackend()
+        self.cache = SearchCache(cache_ttl, cache_size, cache_path) if cache_size else None
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.fetch_time = 0.0 # Total seconds spent waiting on the backend
+        self.fetch_max = 0.0
+
     def search(self, query, max_results = 3):
         '''
         Search the web for the given query and return the results.
         '''
+        key = f"{normalize_query(query)}|{max_results}"
+        results = self.cache.get(key) if self.cache is not None else None
+        if results is not None:
+            self.hits += 1
+            print(f"[Search] Cached: '{query}'")
+            return self._format(results)
+
+        self.misses += 1
         print(f"[Search] Googling: '{query}'...")
-        try: 
-            results = self.ddgs.text(query, max_results = max_results)
+        try:
+            start = time.perf_counter()
+            results = self.backend.text(query, max_results = max_results)
+            elapsed = time.perf_counter() - start
+            self.fetch_time += elapsed
+            self.fetch_max = max(self.fetch_max, elapsed)
             if not results:
-                return "No results found."
+                return "No results found." # Not cached: often just a rate limit
 
-            context_text = '### search results ###\n'
-            for i, res in enumerate(results):
-                context_text += f"Source {i+1}: {res['title']}\n"
-                context_text +=  f"URL: {res['href']}\n"
-                context_text += f"Content: {res['body']}\n\n"
-            return context_text
+            results = [{k: res.get(k, "") for k in ("title", "href", "body")} for res in results]
+            if self.cache is not None:
+                self.cache.put(key, results)
+            return self._format(results)
 
         except Exception as e:
+            self.failures += 1
             print(f"[ERROR] Search Failed: {e}")
             return None
-            
\ No newline at end of file
+
+    def _format(self, results):
+        context_text = '### search results ###\n'
+        for i, res in enumerate(results):
+            context_text += f"Source {i+1}: {res['title']}\n"
+            context_text +=  f"URL: {res['href']}\n"
+            context_text += f"Content: {res['body']}\n\n"
+        return context_text
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        fetches = self.misses - self.failures
+        avg_ms = 1000 * self.fetch_time / fetches if fetches else 0.0
+        return (f"search ({self.backend.name}): hits={self.hits} misses={self.misses} hit_rate={self.hit_rate:.0%} "
+                f"fetch avg={avg_ms:.0f}ms max={1000 * self.fetch_max:.0f}ms failed={self.failures} "
+                f"cached={len(self.cache) if self.cache is not None else 0}")
@@ -0,0 +1,107 @@
+import threading
+import time
+
+# --- Lazy Subsystems ---
+# The Face binds its port first and loads torch, NanoSYNZ, memory, vision... afterwards:
+# in background warm-up threads, or on first use if nobody warmed them.
+
+class Service:
+    def __init__(self, name, factory, warm=True):
+        self.name = name
+        self.factory = factory
+        self.warm = warm           # Start loading at warm_up() instead of on first use
+        self.instance = None
+        self.error = None
+        self.started_at = None
+        self.ready_at = None
+        self.ready = threading.Event() # Set when loading finished (even if it failed)
+        self.callbacks = []        # Run with the instance once it is ready (see call_when_ready)
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.ready.is_set():
+            return "failed" if self.error else "ready"
+        return "loading" if self.started_at else "idle"
+
+class ServiceRegistry:
+    """name -> Service. Each service is built exactly once, by whichever comes first: its warm-up
+    thread or the first get(). A factory that raises leaves the service "failed" (get() returns None),
+    matching the old "continue blind" behaviour of optional subsystems."""
+
+    def __init__(self, t0=None):
+        self.t0 = t0 if t0 is not None else time.perf_counter() # Process start, for cold-start times
+        self.services = {}
+
+    def register(self, name, factory, warm=True):
+        self.services[name] = Service(name, factory, warm)
+
+    def _load(self, service):
+        with service.lock:
+            if service.started_at is not None:
+                return
+            service.started_at = time.perf_counter()
+        try:
+            service.instance = service.factory()
+        except Exception as e:
+            service.error = e
+            print(f"[STARTUP] {service.name} failed to load: {e}")
+        service.ready_at = time.perf_counter()
+        service.ready.set()
+        if not service.error:
+            print(f"[STARTUP] {service.name} ready in {service.ready_at - service.started_at:.1f}s "
+                  f"({service.ready_at - self.t0:.1f}s after launch)")
+        with service.lock:
+            callbacks, service.callbacks = service.callbacks, []
+        for fn in callbacks:
+            self._run_callback(service, fn)
+
+    def _run_callback(self, service, fn):
+        if service.error:
+            return
+        try:
+            fn(service.instance)
+        except Exception as e:
+            print(f"[STARTUP] Deferred {service.name} call failed: {e}")
+
+    def warm_up(self):
+        """Loads every warm service on its own daemon thread (a slow one doesn't hold up the rest)."""
+        for service in self.services.values():
+            if service.warm:
+                threading.Thread(target=self._load, args=(service,), name=f"Warm-{service.name}", daemon=True).start()
+
+    def get(self, name, timeout=None):
+        """The service instance, loading it now if needed. None if it failed or isn't ready by `timeout`."""
+        service = self.services[name]
+        if service.started_at is None:
+            self._load(service)
+        if not service.ready.wait(timeout):
+            return None
+        return service.instance
+
+    def peek(self, name):
+        """The instance if it is already loaded, else None. Never blocks, never starts a load."""
+        service = self.services[name]
+        return service.instance if service.ready.is_set() else None
+
+    def state(self, name):
+        """idle / loading / ready / failed: the readiness flag cheap commands can check."""
+        return self.services[name].state
+
+    def call_when_ready(self, name, fn):
+        """fn(instance) now if the service is loaded, else right after it loads (on the loading thread)."""
+        service = self.services[name]
+        with service.lock:
+            if not service.ready.is_set():
+                service.callbacks.append(fn)
+                return
+        self._run_callback(service, fn)
+
+    def report(self):
+        parts = []
+        for service in self.services.values():
+            if service.state == "ready":
+                parts.append(f"{service.name}=ready({service.ready_at - self.t0:.1f}s)")
+            else:
+                parts.append(f"{service.name}={service.state}")
+        return "services: " + " ".join(parts)
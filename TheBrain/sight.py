@@ -1,10 +1,34 @@
 import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 from PIL import Image
+import numpy as np
 import mss
 import mss.tools
 import os
 import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# --- [NEW] Change detection ---
+ENCODER_SIZE = 378   # Moondream2's vision encoder input; bigger captures are wasted conversion work
+GRID = 32            # Frames are compared as a GRID x GRID thumbnail of cell brightness
+CHANGE_LEVEL = 6     # A cell brighter/darker by more than this (0-255) = the screen changed (one new word does it,
+                     # capture noise and a blinking cursor don't)
+ENCODING_SLOTS = 4   # Recent encodings kept (alt-tabbing back reuses them)
+ANSWER_SLOTS = 64    # (frame, question) -> answer
+
+def frame_signature(pixels):
+    """GRID x GRID mean brightness (uint8) of a BGRA/RGB screenshot array (h, w, >=3).
+    Reads a strided sample only (about 8x8 pixels per cell), no full-frame copy."""
+    h, w = pixels.shape[:2]
+    sample = pixels[::max(1, h // (GRID * 8)), ::max(1, w // (GRID * 8)), :3]
+    r, c = sample.shape[0] // GRID * GRID, sample.shape[1] // GRID * GRID
+    gray = sample[:r, :c].astype(np.float32).mean(axis=2)
+    return gray.reshape(GRID, r // GRID, GRID, c // GRID).mean(axis=(1, 3)).astype(np.uint8)
+
+def frame_changed(a, b):
+    return int(np.abs(a.astype(np.int16) - b).max()) > CHANGE_LEVEL
 
 class SightAgent:
     def __init__(self):
@@ -12,16 +36,34 @@ class SightAgent:
         # Use Moondream2 (Small VLM)
         self.model_id = "vikhyatk/moondream2"
         self.revision = "2024-08-26" # Revert to stable revision (No pyvips required)
-        
+        # [NEW] Caches: an unchanged screen costs only the answer step (or nothing)
+        self.lock = threading.Lock() # One model, many Face turns
+        self.encodings = OrderedDict() # frame key -> (signature, enc_image) (LRU)
+        self.answers = OrderedDict()   # (frame key, question) -> answer (LRU)
+        # [NEW] Background sampler: the latest screen, already encoded
+        self.latest = None   # (frame key, signature, enc_image, last seen on screen)
+        self.max_age = 10.0  # A look trusts `latest` only if the sampler saw it this recently
+        self.sampler = None
+        self.stop_event = threading.Event()
+        # Stats
+        self.ready_hits = 0      # Looks answered from the sampler's encoding (no capture, no encode)
+        self.sampled_encodes = 0
+        self.captures = 0
+        self.encodes = 0
+        self.encode_reuses = 0
+        self.answer_hits = 0
+        self.encode_time = 0.0
+        self.answer_time = 0.0
+
         try:
             # Revert to standard loading. If it fails, we catch it below.
             self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_id, 
-                trust_remote_code=True, 
+                self.model_id,
+                trust_remote_code=True,
                 revision=self.revision
             )
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_id, revision=self.revision)
-            
+
             # Check GPU availability (Moondream works okay on CPU too, but GPU is better)
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
             self.model.to(self.device)
@@ -32,14 +74,92 @@ class SightAgent:
             print(f"[ERR] Vision Init Failed (Continuing Blind): {e}")
             self.model = None
 
-    def capture_screen(self):
-        """Takes a screenshot of the primary monitor."""
+    def grab_screen(self):
+        """Raw screenshot of the primary monitor: (BGRA pixel view, mss shot). No conversion yet."""
         with mss.mss() as sct:
             monitor = sct.monitors[1] # Primary monitor
             sct_img = sct.grab(monitor)
-            # Convert to PIL Image
-            img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-            return img
+        pixels = np.frombuffer(sct_img.bgra, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+        return pixels, sct_img
+
+    def to_image(self, sct_img):
+        """PIL image at (most) the encoder's input size."""
+        img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
+        scale = ENCODER_SIZE / min(img.size)
+        if scale < 1:
+            img = img.resize((round(img.width * scale), round(img.height * scale)), Image.BILINEAR, reducing_gap=2.0)
+        return img
+
+    def capture_screen(self):
+        """Takes a screenshot of the primary monitor."""
+        return self.to_image(self.grab_screen()[1])
+
+    def _encode(self, signature, sct_img):
+        key = hashlib.blake2b(signature.tobytes(), digest_size=8).hexdigest()
+        start = time.perf_counter()
+        enc_image = self.model.encode_image(self.to_image(sct_img))
+        self.encode_time += time.perf_counter() - start
+        self.encodes += 1
+        return key, enc_image
+
+    def _encoding_for(self, pixels, sct_img):
+        """(frame key, enc_image). Encodes only if no stored frame looks the same."""
+        signature = frame_signature(pixels)
+        seen_at = time.time()
+        latest = self.latest
+        if latest and not frame_changed(signature, latest[1]):
+            self.encode_reuses += 1
+            self.latest = (latest[0], latest[1], latest[2], seen_at)
+            return latest[0], latest[2]
+        for key in reversed(self.encodings):
+            if not frame_changed(signature, self.encodings[key][0]):
+                self.encode_reuses += 1
+                self.encodings.move_to_end(key)
+                return key, self.encodings[key][1]
+        key, enc_image = self._encode(signature, sct_img)
+        self.encodings[key] = (signature, enc_image)
+        if len(self.encodings) > ENCODING_SLOTS:
+            self.encodings.popitem(last=False)
+        self.latest = (key, signature, enc_image, seen_at)
+        return key, enc_image
+
+    # --- [NEW] Background Sampler ---
+    def start_sampler(self, interval=5.0, max_age=10.0):
+        """Checks the screen every `interval` seconds and pre-encodes it when it changed, so a look
+        skips capture + encode. Looks fall back to capturing if the sampler's frame is older than `max_age`."""
+        if not self.model or self.sampler:
+            return
+        self.max_age = max_age
+        self.sampler = threading.Thread(target=self._sample_loop, args=(interval,), name="SightSampler", daemon=True)
+        self.sampler.start()
+        print(f"[SIGHT] Watching the screen every {interval:g}s.")
+
+    def stop_sampler(self):
+        self.stop_event.set()
+
+    def _sample_loop(self, interval):
+        while not self.stop_event.wait(interval):
+            try:
+                self._sample()
+            except Exception as e:
+                print(f"[SIGHT] Sampler error: {e}")
+
+    def _sample(self):
+        pixels, sct_img = self.grab_screen()
+        signature = frame_signature(pixels)
+        seen_at = time.time()
+        if not self.lock.acquire(blocking=False):
+            return # A look is using the model right now; it refreshes `latest` itself
+        try:
+            latest = self.latest
+            if latest and not frame_changed(signature, latest[1]):
+                self.latest = (latest[0], latest[1], latest[2], seen_at)
+                return
+            key, enc_image = self._encode(signature, sct_img)
+            self.sampled_encodes += 1
+            self.latest = (key, signature, enc_image, seen_at) # Only the newest is kept (replaces, not cached)
+        finally:
+            self.lock.release()
 
     def analyze(self, query="Describe this image."):
         """Looks at screen and answers query."""
@@ -47,19 +167,45 @@ class SightAgent:
             return "I am blind. (Model load failed)"
 
         try:
-            image = self.capture_screen()
-            
-            # Encode
-            enc_image = self.model.encode_image(image)
-            
-            # Generate
-            answer = self.model.answer_question(enc_image, query, self.tokenizer)
-            
+            with self.lock:
+                self.captures += 1
+                latest = self.latest
+                if self.sampler and latest and time.time() - latest[3] <= self.max_age:
+                    # The sampler already encoded what is on screen
+                    self.ready_hits += 1
+                    key, enc_image = latest[0], latest[2]
+                else:
+                    # Encode (or reuse the encoding of an unchanged screen)
+                    key, enc_image = self._encoding_for(*self.grab_screen())
+
+                question = " ".join(query.lower().split())
+                answer = self.answers.get((key, question))
+                if answer is not None:
+                    self.answer_hits += 1
+                    self.answers.move_to_end((key, question))
+                else:
+                    # Generate
+                    start = time.perf_counter()
+                    answer = self.model.answer_question(enc_image, query, self.tokenizer)
+                    self.answer_time += time.perf_counter() - start
+                    self.answers[(key, question)] = answer
+                    if len(self.answers) > ANSWER_SLOTS:
+                        self.answers.popitem(last=False)
+
             return f"[VISUAL ANALYSIS]: {answer}"
         except Exception as e:
             return f"[BLINDED]: {e}"
 
+    def report(self):
+        answered = self.captures - self.answer_hits
+        return (f"sight: looks={self.captures} ready={self.ready_hits} encodes={self.encodes} "
+                f"(sampler {self.sampled_encodes}) reused={self.encode_reuses} answer_hits={self.answer_hits} "
+                f"encode avg={1000 * self.encode_time / self.encodes if self.encodes else 0:.0f}ms "
+                f"answer avg={1000 * self.answer_time / answered if answered else 0:.0f}ms")
+
 if __name__ == "__main__":
     # Test
     eye = SightAgent()
     print(eye.analyze("What is on the screen right now?"))
+    print(eye.analyze("What is on the screen right now?"))
+    print(eye.report())
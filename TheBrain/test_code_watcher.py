@@ -0,0 +1,38 @@
+import os
+import time
+import tempfile
+from code_watcher import CodeWatcher
+
+def wait_for_change(watcher, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        changed = watcher.poll()
+        if changed:
+            return changed
+        time.sleep(0.05)
+    return None
+
+def test_review_does_not_retrigger():
+    """Reading a file for its diff (opened/closed events on inotify) is not a change."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "Player.cs")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("class Player {}\n")
+        watcher = CodeWatcher(tmp, debounce=0.2, poll_interval=0.1)
+        assert watcher.start()
+        try:
+            time.sleep(0.2) # Let the observer settle on its baseline
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("class Player { int hp; }\n")
+            changed = wait_for_change(watcher)
+            assert changed == {path}
+            assert "+class Player { int hp; }" in watcher.diff(changed)
+            # The diff just opened and read the file: nothing new may come out of that
+            assert wait_for_change(watcher, timeout=1.0) is None
+        finally:
+            watcher.stop()
+
+if __name__ == "__main__":
+    print("[TEST] Editing a script, then reading it for review...")
+    test_review_does_not_retrigger()
+    print("[TEST] SUCCESS: only real edits trigger a review.")
@@ -0,0 +1,44 @@
+import json
+import socket
+import threading
+from core_link import CoreLink, encode_delta, encode_end
+
+def test_stream_keeps_face_traffic():
+    """While a Core stream is being read, a Unity/Ears datagram to the Face port is left for the main loop."""
+    face = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    face.bind(("127.0.0.1", 0))
+    face.settimeout(5.0)
+    core = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    core.bind(("127.0.0.1", 0))
+    core.settimeout(5.0)
+    unity = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def fake_core():
+        data, addr = core.recvfrom(65535)
+        request_id = json.loads(data)["id"]
+        deltas = ["Hel", "lo ", "there."]
+        for seq, delta in enumerate(deltas):
+            core.sendto(encode_delta(request_id, seq, delta), addr)
+            if seq == 0:
+                unity.sendto(b"user turn sent mid-stream", face.getsockname())
+        core.sendto(encode_end(request_id, len(deltas), "".join(deltas)), addr)
+
+    link = CoreLink(core.getsockname(), timeout=5.0).start()
+    thread = threading.Thread(target=fake_core)
+    thread.start()
+    pieces = []
+    try:
+        reply = link.request({"user": "hi", "stream": True}, on_delta=pieces.append)
+    finally:
+        link.stop()
+        thread.join()
+    assert reply == "Hello there." and "".join(pieces) == reply
+    assert face.recvfrom(65535)[0] == b"user turn sent mid-stream"
+    assert link.orphaned == 0 and link.lost_packets == 0
+    for s in (face, core, unity):
+        s.close()
+
+if __name__ == "__main__":
+    print("[TEST] Streaming from a fake Core while Unity talks to the Face...")
+    test_stream_keeps_face_traffic()
+    print("[TEST] SUCCESS: no Face datagram was dropped during the stream.")
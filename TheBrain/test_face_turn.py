@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip("edge_tts")
+pytest.importorskip("colorama")
+try:
+    import face_server # Binds the Face port, loads nothing (see the __main__ guard)
+except OSError as e:
+    pytest.skip(f"Face port busy ({e}), is a Face running?", allow_module_level=True)
+
+CLIENT = ("127.0.0.1", 50123)
+REPLY = "Sure thing, mate. The build passed on the first try. Anything else you need?"
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((data.decode('utf-8'), addr))
+
+class FakeSpeech:
+    """Stands in for tts_engine.SpeechPipeline: records sentences instead of synthesizing them."""
+    def __init__(self):
+        self.futures = []
+
+    def say(self, text):
+        self.futures.append(text)
+
+    def close(self):
+        pass
+
+def run_turn(monkeypatch, ask_core):
+    sock, speech = FakeSocket(), FakeSpeech()
+    monkeypatch.setattr(face_server, "sock", sock)
+    monkeypatch.setattr(face_server, "start_speech", lambda addr: speech)
+    face_server.process_message("hello there", CLIENT, ask_core)
+    return sock, speech
+
+def test_non_streamed_reply_is_spoken(monkeypatch):
+    """A Core that answers in one packet (legacy Core, STREAM_FROM_CORE off, "..." fallback) still gets voiced."""
+    def ask_core(packet, on_delta=None):
+        return REPLY # Never calls on_delta
+    sock, speech = run_turn(monkeypatch, ask_core)
+    assert speech.futures == face_server.tts_engine.split_sentences(REPLY)
+    assert (REPLY, CLIENT) in sock.sent
+
+def test_streamed_reply_is_spoken_once(monkeypatch):
+    def ask_core(packet, on_delta=None):
+        for i in range(0, len(REPLY), 7):
+            on_delta(REPLY[i:i + 7])
+        return REPLY
+    sock, speech = run_turn(monkeypatch, ask_core)
+    assert " ".join(speech.futures) == " ".join(face_server.tts_engine.split_sentences(REPLY))
+    assert (REPLY, CLIENT) in sock.sent
+
+def test_first_reply_is_a_chat_reply(monkeypatch):
+    """Handshakes and commands don't end the cold start, the first chat reply does."""
+    monkeypatch.setattr(face_server, "first_reply_at", None)
+    monkeypatch.setattr(face_server, "UNITY_ADDR", None)
+    sock = FakeSocket()
+    monkeypatch.setattr(face_server, "sock", sock)
+    monkeypatch.setattr(face_server, "start_speech", lambda addr: FakeSpeech())
+    for command in ("unity connected", "!status", "!bad"):
+        face_server.process_message(command, CLIENT, lambda packet, on_delta=None: REPLY)
+    assert face_server.first_reply_at is None and len(sock.sent) == 3
+    face_server.process_message("hello there", CLIENT, lambda packet, on_delta=None: REPLY)
+    assert face_server.first_reply_at is not None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import torch
+from model import NanoSYNZ, load_quantized, validation_loss
+
+VOCAB_SIZE = 69
+CONFIG = dict(vocab_size=VOCAB_SIZE, n_embed=384, block_size=64, n_head=6, n_layer=6, fused=True)
+
+def test_int8_close_to_fp32():
+    """Quantized logits stay close, and the cache is reused (same weights) on the second load."""
+    torch.manual_seed(0)
+    model = NanoSYNZ(**CONFIG).eval()
+    val_tokens = torch.randint(0, VOCAB_SIZE, (2000,))
+    idx = torch.randint(0, VOCAB_SIZE, (2, 64))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synz_face.pth")
+        torch.save(model.state_dict(), path)
+        qmodel, info = load_quantized(NanoSYNZ(**CONFIG), path, val_tokens=val_tokens)
+        assert os.path.exists(os.path.join(tmp, "synz_face.int8.pt"))
+        assert abs(info["int8_val_loss"] - info["fp32_val_loss"]) < 0.05 * info["fp32_val_loss"]
+        assert info["fp32_val_loss"] == validation_loss(model, val_tokens)
+
+        cached, cached_info = load_quantized(NanoSYNZ(**CONFIG), path) # No val tokens: must come from the cache
+        assert cached_info == info
+        with torch.no_grad():
+            full, _ = model(idx)
+            q, _ = qmodel(idx)
+            q2, _ = cached(idx)
+        assert torch.equal(q, q2)
+        assert (full - q).abs().max() < 0.25, (full - q).abs().max()
+        # Batched and cached generation work on the quantized model too
+        assert len(cached.generate_batch([idx[0, :10].tolist()], max_new_tokens=5)[0]) == 5
+
+if __name__ == "__main__":
+    print("[TEST] Comparing int8 to fp32...")
+    test_int8_close_to_fp32()
+    print("[TEST] SUCCESS: int8 model matches fp32 closely and loads from its cache.")
@@ -0,0 +1,87 @@
+import time
+import threading
+import torch
+from model import NanoSYNZ
+
+# Small random brain (no weights needed, we only compare the two decode paths)
+VOCAB_SIZE = 69
+BLOCK_SIZE = 64
+
+def make_model():
+    torch.manual_seed(0)
+    model = NanoSYNZ(vocab_size=VOCAB_SIZE, n_embed=384, block_size=BLOCK_SIZE, n_head=6, n_layer=6)
+    model.eval()
+    return model
+
+def test_cached_logits_match():
+    model = make_model()
+    idx = torch.randint(0, VOCAB_SIZE, (2, 20))
+    with torch.no_grad():
+        full, _ = model(idx)
+        model.reset_cache()
+        prefill, _ = model(idx[:, :12], use_cache=True)
+        steps = [model(idx[:, t:t+1], use_cache=True)[0] for t in range(12, 20)]
+        model.reset_cache()
+    cached = torch.cat([prefill] + steps, dim=1)
+    assert torch.allclose(full, cached, atol=1e-5), (full - cached).abs().max()
+
+def test_cached_tokens_match():
+    model = make_model()
+    prompt = torch.randint(0, VOCAB_SIZE, (1, 20))
+    # 100 tokens pushes well past block_size, so the roll-over is exercised too
+    torch.manual_seed(1337)
+    slow = model.generate(prompt, max_new_tokens=100, use_cache=False)
+    torch.manual_seed(1337)
+    fast = model.generate(prompt, max_new_tokens=100, use_cache=True)
+    assert torch.equal(slow, fast)
+
+def test_rollover_prefills_rarely():
+    """A full window rebuilds from the last rollover_keep tokens, not on every step."""
+    model = make_model()
+    prefills = []
+    forward = model.forward
+    model.forward = lambda idx, *args, **kwargs: (prefills.append(idx.shape[1]) if idx.shape[1] > 1 else None) or forward(idx, *args, **kwargs)
+    model.generate(torch.randint(0, VOCAB_SIZE, (1, 20)), max_new_tokens=100, use_cache=True)
+    # 20 + 100 tokens: the first prefill, then a roll-over at 65, 81, 97 and 113 tokens (every block_size/4)
+    assert prefills == [20] + [model.rollover_keep] * 4, prefills
+
+def test_concurrent_generation():
+    """The cache lives on the modules, so concurrent turns on one model take turns instead of mixing caches."""
+    model = make_model()
+    prompt = torch.randint(0, VOCAB_SIZE, (1, 20))
+    results, errors = [], []
+
+    def turn(n):
+        try:
+            if n % 2:
+                results.append(model.generate(prompt, max_new_tokens=30).shape[1] - 20)
+            else:
+                results.append(len(model.generate_batch([prompt[0].tolist()] * 2, max_new_tokens=30)[0]))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=turn, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and results == [30] * 4
+    assert model.cache_pos == 0
+
+if __name__ == "__main__":
+    print("[TEST] Comparing cached vs uncached logits...")
+    test_cached_logits_match()
+    print("[TEST] Comparing cached vs uncached tokens (100 new)...")
+    test_cached_tokens_match()
+    print("[TEST] Counting roll-over prefills...")
+    test_rollover_prefills_rarely()
+    print("[TEST] Generating from 4 threads at once...")
+    test_concurrent_generation()
+
+    model = make_model()
+    prompt = torch.randint(0, VOCAB_SIZE, (1, 8))
+    for use_cache in (False, True):
+        start = time.time()
+        model.generate(prompt, max_new_tokens=50, use_cache=use_cache)
+        print(f"[TEST] use_cache={use_cache}: {time.time() - start:.3f}s for 50 tokens")
+    print("[TEST] SUCCESS: KV cache matches the uncached path.")
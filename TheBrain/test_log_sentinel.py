@@ -0,0 +1,35 @@
+from log_sentinel import LogSentinel
+
+HEADER = "NullReferenceException: Object reference not set to an instance of an object\n"
+STACK = ("Player.Update () (at Assets/Scripts/Player.cs:42)\n"
+         "GameManager.Tick () (at Assets/Scripts/GameManager.cs:88)\n")
+
+def test_stack_trace_in_next_chunk():
+    """Unity flushes a header and its stack trace separately: the record waits for the log to go quiet."""
+    whole = LogSentinel()
+    whole.ingest(HEADER + STACK, now=100.0)
+    expected = whole.escalations(now=101.0)
+
+    split = LogSentinel()
+    split.ingest(HEADER, now=100.0)
+    assert split.escalations(now=100.1) == [] # Polled between the two chunks
+    split.ingest(STACK, now=100.2)
+    assert split.escalations(now=100.3) == []
+    alerts = split.escalations(now=100.7) # 0.5s quiet
+    assert len(alerts) == 1 and alerts[0]["fingerprint"] == expected[0]["fingerprint"]
+    assert alerts[0]["sample"] == HEADER + STACK.rstrip("\n")
+
+def test_next_header_finishes_record():
+    sentinel = LogSentinel()
+    assert sentinel.ingest(HEADER + STACK, now=100.0) == 0 # Trailing record still open
+    assert sentinel.ingest("Assets/Scripts/Enemy.cs(12,5): error CS1002: ; expected\n", now=100.1) == 1
+    assert len(sentinel.escalations(now=100.2)) == 1
+    assert len(sentinel.escalations(now=100.6)) == 1 # The compile error, once the log is quiet
+    assert sentinel.records == 2
+
+if __name__ == "__main__":
+    print("[TEST] Header and stack trace in separate chunks...")
+    test_stack_trace_in_next_chunk()
+    print("[TEST] A new header closes the previous record...")
+    test_next_header_finishes_record()
+    print("[TEST] SUCCESS: error records survive chunk boundaries.")
@@ -0,0 +1,119 @@
+import os
+import tempfile
+from memory_agent import MemoryAgent
+from memory_index import KeywordIndex
+from memory_vectors import HashingEmbedder
+
+# Stored the way face_server stores a turn: "User: ...\nSYNZ: ..."
+EXCHANGES = [
+    ("My name is Jordan.", "Nice to meet you, Jordan! I'm SYNZ, your digital co-pilot."),
+    ("I work at a bakery downtown.", "Early mornings and fresh bread, sounds like a solid gig."),
+    ("My cat is called Pixel.", "Pixel is a great name for a cat, very on brand."),
+    ("I'm learning Rust this month.", "Good pick. The borrow checker is strict but fair."),
+    ("My favourite colour is green.", "Green it is. Very calm, very forest."),
+    ("Can you fix my Unity build?", "Sure, send me the error log and I'll have a look."),
+    ("I live in Melbourne.", "Melbourne! Coffee capital. Bring an umbrella."),
+    ("My birthday is on March 3rd.", "Noted, March 3rd. I'll remember that."),
+    ("I drive a blue Subaru.", "Solid choice, those things last forever."),
+    ("My sister Emma is visiting next week.", "Nice, say hi to Emma from me."),
+]
+QUESTIONS = [
+    ("What's my name?", 0), ("Where do I work?", 1), ("What's my cat called?", 2),
+    ("Which language am I learning?", 3), ("What is my favourite colour?", 4), ("Where do I live?", 6),
+    ("When is my birthday?", 7), ("What car do I drive?", 8), ("Who is visiting me?", 9),
+]
+
+def make_agent(tmp, **kwargs):
+    agent = MemoryAgent(db_path=os.path.join(tmp, "memories.json"), **kwargs)
+    ids = [agent.remember(f"User: {user}\nSYNZ: {reply}")['id'] for user, reply in EXCHANGES]
+    return agent, ids
+
+def test_hybrid_recall():
+    """Every question recalls its exchange first (the default Face configuration)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        agent, ids = make_agent(tmp)
+        for question, expected in QUESTIONS:
+            hits = agent.search(question)
+            assert hits and hits[0][1] == ids[expected], question
+        assert "My name is Jordan." in agent.recall("What's my name?")
+
+def test_vector_recall():
+    """Embeddings alone still find the basic facts, and unrelated chatter recalls nothing."""
+    with tempfile.TemporaryDirectory() as tmp:
+        agent, ids = make_agent(tmp, recall_mode="vector")
+        found = sum(1 for question, expected in QUESTIONS
+                    if (hits := agent.search(question)) and hits[0][1] == ids[expected])
+        assert found >= len(QUESTIONS) - 1, found
+        assert "My name is Jordan." in agent.recall("What's my name?")
+        for chatter in ("Tell me a joke.", "Explain recursion please.", "Thanks mate!"):
+            assert agent.recall(chatter) == "", chatter
+
+def test_reload_after_forget_keeps_indexes():
+    """A journaled delete leaves the saved indexes behind; a restart drops only that id (no full rebuild)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        agent, ids = make_agent(tmp, storage="journal")
+        agent.save_memories() # Compaction: indexes written
+        agent.forget([ids[2]])
+        agent.close()
+
+        embedded, indexed = [], []
+        embed, add = HashingEmbedder.embed, KeywordIndex.add
+        HashingEmbedder.embed = lambda self, texts: embedded.extend(texts) or embed(self, texts)
+        KeywordIndex.add = lambda self, doc_id, text: indexed.append(doc_id) or add(self, doc_id, text)
+        try:
+            reloaded = MemoryAgent(db_path=os.path.join(tmp, "memories.json"), storage="journal")
+        finally:
+            HashingEmbedder.embed, KeywordIndex.add = embed, add
+        assert embedded == [] and indexed == []
+        assert len(reloaded.index) == len(reloaded.vectors) == len(EXCHANGES) - 1
+        assert ids[2] not in reloaded.index and ids[2] not in reloaded.vectors
+        assert all(ids[2] not in posting for posting in reloaded.index.postings.values())
+        assert reloaded.search("What's my name?")[0][1] == ids[0]
+        reloaded.close()
+
+def test_consolidation_keeps_distinct_facts():
+    """Repeats merge; facts that differ only by a number or a name survive."""
+    meeting = ("User: Remind me that the meeting with the design team moved to room {} on Friday afternoon.\n"
+               "SYNZ: Got it, design team meeting in room {} on Friday afternoon.")
+    for recall_mode in ("hybrid", "keyword"):
+        with tempfile.TemporaryDirectory() as tmp:
+            agent = MemoryAgent(db_path=os.path.join(tmp, "memories.json"), recall_mode=recall_mode)
+            distinct = [agent.remember(meeting.format(n, n))['id'] for n in (3, 4)]
+            distinct += [agent.remember(f"User: fact number {n} about cats")['id'] for n in (3, 4)]
+            repeat = [agent.remember("User: I live in Melbourne.\nSYNZ: Nice!")['id'],
+                      agent.remember("User: I live in Melbourne\nSYNZ: Nice.")['id']]
+            merged, _ = agent.consolidate_step()
+            assert merged == 1, recall_mode
+            assert all(doc_id in agent.by_id for doc_id in distinct), recall_mode
+            assert sum(doc_id in agent.by_id for doc_id in repeat) == 1
+
+def test_flush_writes_json_once():
+    """Hit counts from many recalls (and a batch of merges) cost one JsonStore rewrite and one index save."""
+    with tempfile.TemporaryDirectory() as tmp:
+        agent, ids = make_agent(tmp)
+        for _ in range(3):
+            agent.remember("User: I live in Melbourne.\nSYNZ: Nice!")
+        for question, _ in QUESTIONS:
+            agent.recall(question)
+        assert len(agent.dirty) > 1
+        writes = []
+        save, save_index = agent.store.save, agent.save_index
+        agent.store.save = lambda memories: writes.append("store") or save(memories)
+        agent.save_index = lambda: writes.append("index") or save_index()
+        merged, _ = agent.consolidate_step()
+        assert merged == 2 and writes == ["store", "index"] and not agent.dirty
+        reloaded = MemoryAgent(db_path=os.path.join(tmp, "memories.json"))
+        assert sum(m['metadata'].get("hits", 0) for m in reloaded.memories) >= len(QUESTIONS)
+
+if __name__ == "__main__":
+    print("[TEST] Hybrid recall on stored exchanges...")
+    test_hybrid_recall()
+    print("[TEST] Vector-only recall...")
+    test_vector_recall()
+    print("[TEST] Reloading after a journaled delete...")
+    test_reload_after_forget_keeps_indexes()
+    print("[TEST] Consolidating near-duplicates...")
+    test_consolidation_keeps_distinct_facts()
+    print("[TEST] Flushing hit counts to JSON storage...")
+    test_flush_writes_json_once()
+    print("[TEST] SUCCESS: recall, reload and consolidation behave.")
@@ -0,0 +1,62 @@
+import os
+import tempfile
+from memory_index import KeywordIndex
+
+MEMORIES = {
+    "m1": "User: my dog is called biscuit\nSYNZ: biscuit is a good name for a dog",
+    "m2": "User: i work night shifts at the hospital\nSYNZ: night shifts are rough, drink water",
+    "m3": "User: my favourite band is radiohead\nSYNZ: ok computer is a classic album",
+    "m4": "User: the unity build fails on android\nSYNZ: send me the gradle error log",
+    "m5": "User: i am saving up for a motorbike\nSYNZ: a motorbike is a fun way to commute",
+}
+QUERIES = [
+    ("what is my dog called", "m1"),
+    ("do i work night shifts", "m2"),
+    ("which band is my favourite", "m3"),
+    ("why does the unity build fail on android", "m4"),
+    ("what am i saving up for", "m5"),
+]
+
+def scan_recall(memories, query):
+    """The recall KeywordIndex replaced: count the words a memory shares with the query."""
+    query_words = set(query.lower().split())
+    scored = [(len(query_words & set(text.lower().split())), doc_id) for doc_id, text in memories.items()]
+    scored = [s for s in scored if s[0] > 0]
+    scored.sort(key=lambda s: s[0], reverse=True)
+    return scored[0][1] if scored else None
+
+def make_index():
+    index = KeywordIndex()
+    for doc_id, text in MEMORIES.items():
+        index.add(doc_id, text)
+    return index
+
+def test_top_hit_matches_scan():
+    index = make_index()
+    for query, expected in QUERIES:
+        assert scan_recall(MEMORIES, query) == expected, query # The fixture itself is unambiguous
+        assert index.search(query)[0][1] == expected, query
+
+def test_removed_ids_never_come_back():
+    index = make_index()
+    index.remove("m1", MEMORIES["m1"]) # The usual path (forget, consolidation)
+    index.remove("m4")                 # A stale id: no text to find its posting lists
+    index.add("m3", "User: i switched to jazz")  # Re-adding replaces the old terms
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "keyword_index.json")
+        index.save(path)
+        reloaded = KeywordIndex()
+        assert reloaded.load(path)
+    for idx in (index, reloaded):
+        assert len(idx) == 3 and "m1" not in idx and "m4" not in idx
+        assert idx.search("dog biscuit") == [] and idx.search("gradle android") == []
+        assert idx.search("radiohead") == [] and idx.search("jazz")[0][1] == "m3"
+        assert all(doc_id not in posting for posting in idx.postings.values() for doc_id in ("m1", "m4"))
+        assert idx.total_len == sum(idx.doc_len.values())
+
+if __name__ == "__main__":
+    print("[TEST] BM25 top hit vs the old overlap scan...")
+    test_top_hit_matches_scan()
+    print("[TEST] Removing and replacing memories...")
+    test_removed_ids_never_come_back()
+    print("[TEST] SUCCESS: the keyword index ranks like the scan and forgets what it should.")
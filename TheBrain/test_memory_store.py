@@ -0,0 +1,85 @@
+import os
+import json
+import tempfile
+from memory_store import JournalStore, migrate_json_to_journal
+
+def make_entry(n, hits=0):
+    return {"id": f"mem-{n}", "text": f"User: fact number {n}\nSYNZ: noted {n}", "metadata": {"hits": hits}}
+
+def test_truncated_last_line():
+    """A crash mid-write leaves half a record: replay keeps everything before it, and writing resumes cleanly."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JournalStore(os.path.join(tmp, "memories.json"))
+        memories = [make_entry(n) for n in range(3)]
+        for n, entry in enumerate(memories):
+            store.append(entry, memories[:n + 1])
+        store.close()
+        with open(store.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"op": "add", "entry": make_entry(3)})[:25]) # Torn, no newline
+
+        store = JournalStore(store.legacy_path)
+        assert store.load() == memories
+        memories.append(make_entry(4))
+        store.append(memories[-1], memories)
+        store.close()
+        assert JournalStore(store.legacy_path).load() == memories
+
+def test_compaction_keeps_state():
+    """Adds, hit-count puts and deletes replay to the same memories before and after the 500-record compaction."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JournalStore(os.path.join(tmp, "memories.json"))
+        memories = {}
+        compactions = []
+        for n in range(700):
+            if n % 5 == 3: # Every few records: a hit on an older memory...
+                entry = dict(memories[f"mem-{n - 2}"], metadata={"hits": n})
+                memories[entry['id']] = entry
+                wrote = store.update(entry, list(memories.values()))
+            elif n % 5 == 4: # ...and a forget
+                del memories[f"mem-{n - 4}"]
+                wrote = store.delete([f"mem-{n - 4}"], list(memories.values()))
+            else:
+                memories[f"mem-{n}"] = make_entry(n)
+                wrote = store.append(memories[f"mem-{n}"], list(memories.values()))
+            if wrote:
+                compactions.append(n)
+                assert os.path.getsize(store.journal_path) == 0
+                assert JournalStore(store.legacy_path).load() == list(memories.values())
+        assert compactions == [499] and store.records == 200
+        store.close()
+        reloaded = JournalStore(store.legacy_path)
+        assert reloaded.load() == list(memories.values()) and reloaded.records == 200
+
+def test_migration_round_trip():
+    """An old synz_memories.json becomes the snapshot on first load; the JSON file itself is left alone."""
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "memories.json")
+        memories = [make_entry(n, hits=n) for n in range(5)]
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            json.dump(memories, f, indent=2)
+        with open(legacy_path, 'rb') as f:
+            original = f.read()
+
+        store = migrate_json_to_journal(legacy_path)
+        assert store.load() == memories
+        store = JournalStore(legacy_path) # Snapshot exists now: no second migration
+        assert store.load() == memories
+        memories.append(make_entry(5))
+        store.append(memories[-1], memories)
+        store.close()
+        assert JournalStore(legacy_path).load() == memories
+        with open(legacy_path, 'rb') as f:
+            assert f.read() == original
+
+        os.remove(store.snapshot_path) # First start of a JournalStore on an old install: load() migrates
+        os.remove(store.journal_path)
+        assert JournalStore(legacy_path).load() == memories[:5]
+
+if __name__ == "__main__":
+    print("[TEST] Replaying a journal with a torn last line...")
+    test_truncated_last_line()
+    print("[TEST] Compacting after 500 records...")
+    test_compaction_keeps_state()
+    print("[TEST] Migrating synz_memories.json to the journal...")
+    test_migration_round_trip()
+    print("[TEST] SUCCESS: the journal replays, compacts and migrates without losing memories.")
@@ -0,0 +1,77 @@
+import os
+import time
+import tempfile
+from search_agent import SearchAgent, FixtureBackend
+
+FIXTURES = {
+    "weather in melbourne": [{"title": "Melbourne forecast", "href": "https://example.com/mel", "body": "Showers, 17C"}],
+    "bitcoin price": [{"title": "BTC", "href": "https://example.com/btc", "body": "Up 2% today"}],
+    "who is the prime minister": [{"title": "PM", "href": "https://example.com/pm", "body": "..."}],
+}
+
+def test_hits_and_misses():
+    backend = FixtureBackend(FIXTURES)
+    agent = SearchAgent(backend=backend)
+    first = agent.search("Weather in Melbourne?")
+    assert "Melbourne forecast" in first
+    assert agent.search("weather in   melbourne") == first # Same normalized query
+    assert agent.search("Bitcoin price!") and agent.search("bitcoin price")
+    assert (agent.hits, agent.misses, backend.calls) == (2, 2, 2)
+    assert agent.hit_rate == 0.5
+    # Empty results are not cached (often a rate limit): the next ask goes out again
+    assert agent.search("unknown thing") == "No results found."
+    agent.search("unknown thing")
+    assert backend.calls == 4 and len(agent.cache) == 2
+
+def test_ttl_expiry():
+    backend = FixtureBackend(FIXTURES)
+    agent = SearchAgent(backend=backend, cache_ttl=0.2)
+    agent.search("bitcoin price")
+    agent.search("bitcoin price")
+    assert backend.calls == 1
+    time.sleep(0.3)
+    agent.search("bitcoin price") # Stale: fetched again
+    assert backend.calls == 2 and (agent.hits, agent.misses) == (1, 2)
+
+def test_lru_bound():
+    backend = FixtureBackend(FIXTURES)
+    agent = SearchAgent(backend=backend, cache_size=2)
+    agent.search("weather in melbourne")
+    agent.search("bitcoin price")
+    agent.search("weather in melbourne") # Now the most recent
+    agent.search("who is the prime minister") # Evicts bitcoin, the least recently used
+    assert len(agent.cache) == 2
+    calls = backend.calls
+    agent.search("weather in melbourne")
+    assert backend.calls == calls
+    agent.search("bitcoin price")
+    assert backend.calls == calls + 1
+
+def test_cache_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search_cache.json")
+        SearchAgent(backend=FixtureBackend(FIXTURES), cache_path=path).search("bitcoin price")
+        backend = FixtureBackend(FIXTURES)
+        agent = SearchAgent(backend=backend, cache_path=path)
+        assert "BTC" in agent.search("bitcoin price")
+        assert backend.calls == 0 and agent.hits == 1
+
+if __name__ == "__main__":
+    print("[TEST] Hit/miss counters...")
+    test_hits_and_misses()
+    print("[TEST] TTL expiry...")
+    test_ttl_expiry()
+    print("[TEST] LRU size bound...")
+    test_lru_bound()
+    print("[TEST] Persistence...")
+    test_cache_survives_restart()
+
+    # Benchmark: a chatty session repeating a few searches against a 300ms "network"
+    queries = ["weather in melbourne", "bitcoin price", "Weather in Melbourne?", "who is the prime minister"] * 5
+    for cache_size in (0, 256):
+        agent = SearchAgent(backend=FixtureBackend(FIXTURES, latency=0.3), cache_size=cache_size)
+        start = time.time()
+        for query in queries:
+            agent.search(query)
+        print(f"[TEST] {len(queries)} searches, cache_size={cache_size}: {time.time() - start:.2f}s | {agent.report()}")
+    print("[TEST] SUCCESS: search cache expires, stays bounded and counts correctly.")
@@ -2,7 +2,7 @@
 import torch
 import torch.nn as nn
 from torch.nn import functional as F
-from model import NanoSYNZ
+from model import NanoSYNZ, load_checkpoint
 import json
 import os
 
@@ -93,7 +93,8 @@ model = NanoSYNZ(
     n_embed=n_embed, 
     block_size=block_size, 
     n_head=n_head, 
-    n_layer=n_layer
+    n_layer=n_layer,
+    fused=True # [NEW] One QKV projection + SDPA per layer
 )
 m = model.to(device)
 print(f"[SYNZ] Model Parameters: {sum(p.numel() for p in m.parameters())/1e6:.2f} M")
@@ -103,7 +104,7 @@ model_path = os.path.join(script_dir, "synz_face.pth")
 if os.path.exists(model_path):
     print(f"[SYNZ] Found existing memory: {model_path}")
     try:
-        model.load_state_dict(torch.load(model_path, map_location=device))
+        load_checkpoint(model, model_path, map_location=device) # Old per-Head checkpoints get fused
         print("[SYNZ] Memory Restored. Continuing education...")
     except Exception as e:
         print(f"[SYNZ] Memory Corrupted or Mismatched! Starting fresh. ({e})")
@@ -1,7 +1,14 @@
 import asyncio
 import edge_tts
 import sys
+import os
+import re
+import time
+import hashlib
+import threading
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, CancelledError
 
 # [FIX] Suppress the asyncio warning on Windows
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -12,30 +19,335 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 # en-AU-NatashaNeural (Australian Female) [SELECTED]
 # en-AU-WilliamNeural (Australian Male)
 VOICE = "en-AU-NatashaNeural" 
+RATE = "+0%"
+PITCH = "+15Hz" # Pitch +15Hz makes it sound slightly younger (Teen)
 OUTPUT_FILE = "test_audio.mp3"
 
 async def generate_voice(text, filename):
     print(f"[TTS] Generating: '{text}' using {VOICE}")
-    # Pitch +15Hz makes it sound slightly younger (Teen)
-    communicate = edge_tts.Communicate(text, VOICE, rate="+0%", pitch="+15Hz") 
+    communicate = edge_tts.Communicate(text, VOICE, rate=RATE, pitch=PITCH) 
     await communicate.save(filename)
     print(f"[TTS] Saved to {filename}")
 
-    print(f"[TTS] Saved to {filename}")
+# --- [NEW] TTS Service (one event loop for the whole process) ---
+class TTSService:
+    """Owns a single asyncio loop on a daemon thread. Jobs are handed over with
+    run_coroutine_threadsafe (the loop's own thread-safe queue) and come back as
+    concurrent.futures.Future, so callers on any thread can wait, poll or cancel them."""
 
-def generate_audio_sync(text, filename):
-    """Synchronous wrapper for Face Server."""
-    try:
+    def __init__(self, max_concurrent=3, timeout=30.0):
+        self.max_concurrent = max_concurrent # Simultaneous edge_tts connections
+        self.timeout = timeout
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.pending = {} # Future -> tag
+        # Stats
+        self.done = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def start(self):
         if sys.platform == "win32":
             # Policy fix for Windows
             asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-            
-        asyncio.run(generate_voice(text, filename))
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="TTSLoop", daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.slots = asyncio.Semaphore(self.max_concurrent) # Must be created on the loop's thread
+        ready.set()
+        self.loop.run_forever()
+
+    async def _job(self, text, filename):
+        async with self.slots:
+            await asyncio.wait_for(generate_voice(text, filename), self.timeout)
+        return filename
+
+    def submit(self, text, filename, tag=None):
+        """Queues a synthesis job. Returns a Future resolving to `filename`."""
+        future = asyncio.run_coroutine_threadsafe(self._job(text, filename), self.loop)
+        with self.lock:
+            self.pending[future] = tag
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self.lock:
+            self.pending.pop(future, None)
+            if future.cancelled():
+                self.cancelled += 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                self.done += 1
+
+    def cancel(self, tag):
+        """Cancels every unfinished job submitted with `tag` (e.g. a reply the user talked over)."""
+        with self.lock:
+            stale = [f for f, t in self.pending.items() if t == tag]
+        return sum(1 for f in stale if f.cancel())
+
+    def stop(self):
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def report(self):
+        return f"tts service: pending={len(self.pending)} done={self.done} failed={self.failed} cancelled={self.cancelled}"
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TTSService().start()
+        return _service
+
+def generate_audio_sync(text, filename, tag=None):
+    """Synchronous wrapper for Face Server (runs on the shared TTSService loop)."""
+    try:
+        get_service().submit(text, filename, tag=tag).result()
         return True
+    except CancelledError:
+        return False
     except Exception as e:
         print(f"[TTS ERROR] {e}")
         return False
 
+# --- [NEW] Audio Cache ---
+class AudioCache:
+    """Disk cache of synthesized clips, content-addressed by sha256(text|voice|rate|pitch).
+
+    A cached file is never rewritten, so a hit can be handed to Unity as-is. Past max_bytes the least
+    recently used clips are evicted, except ones used in the last `keep_recent` seconds (Unity may still
+    be loading them)."""
+
+    def __init__(self, cache_dir, max_bytes=64 * 1024 * 1024, keep_recent=120.0):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.keep_recent = keep_recent
+        self.lock = threading.Lock()
+        self.entries = OrderedDict() # key -> [size, last_used] (LRU order)
+        self.total_bytes = 0
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.evictions = 0
+        self.bytes_saved = 0 # Audio we did not have to synthesize again
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    def key(self, text):
+        return hashlib.sha256(f"{text}|{VOICE}|{RATE}|{PITCH}".encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _load(self):
+        """Startup: rebuild the LRU from the files on disk (mtime = last use)."""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp"): # Interrupted synthesis
+                try: os.remove(path)
+                except OSError: pass
+            elif name.endswith(".mp3"):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, name[:-len(".mp3")], stat.st_size))
+        for mtime, key, size in sorted(found):
+            self.entries[key] = [size, mtime]
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        now = time.time()
+        for key in list(self.entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            size, last_used = self.entries[key]
+            if now - last_used < self.keep_recent:
+                continue
+            del self.entries[key]
+            self.total_bytes -= size
+            self.evictions += 1
+            try: os.remove(self._path(key))
+            except OSError: pass
+
+    def fetch(self, text, tag=None):
+        """Path of the clip for `text`, synthesizing it on a miss. None if synthesis failed."""
+        key = self.key(text)
+        path = self._path(key)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and os.path.exists(path):
+                entry[1] = time.time()
+                self.entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_saved += entry[0]
+                try: os.utime(path) # Keep the LRU order across restarts
+                except OSError: pass
+                return path
+            if entry: # Deleted behind our back
+                del self.entries[key]
+                self.total_bytes -= entry[0]
+            self.misses += 1
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        ok = generate_audio_sync(text, tmp_path, tag=tag)
+        if not ok or not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+            with self.lock:
+                self.failures += 1
+            try: os.remove(tmp_path)
+            except OSError: pass
+            return None
+        os.replace(tmp_path, path) # Readers only ever see a complete file
+        size = os.path.getsize(path)
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = [size, time.time()]
+                self.total_bytes += size
+            self.entries.move_to_end(key)
+            self._evict()
+        return path
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        mb = 1024 * 1024
+        return (f"voice cache: hits={self.hits} misses={self.misses} hit_rate={self.hit_rate:.0%} "
+                f"saved={self.bytes_saved / mb:.1f}MB size={self.total_bytes / mb:.1f}/{self.max_bytes / mb:.0f}MB "
+                f"clips={len(self.entries)} evicted={self.evictions} failed={self.failures}")
+
+# --- [NEW] Sentence Pipelining ---
+SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+|\n+")
+MIN_SENTENCE = 12 # Shorter bits ("Oh.", "Hi!") get glued to the next one, no point in tiny clips
+
+def split_sentences(text):
+    sentences = []
+    carry = ""
+    for part in SENTENCE_END.split(text):
+        part = (carry + " " + part).strip() if carry else part.strip()
+        if not part:
+            continue
+        if len(part) < MIN_SENTENCE:
+            carry = part
+            continue
+        sentences.append(part)
+        carry = ""
+    if carry:
+        sentences.append(carry)
+    return sentences
+
+class SentenceSplitter:
+    """Cuts streamed text into sentences as soon as each one is finished."""
+
+    def __init__(self):
+        self.buffer = ""
+        self.carry = "" # Finished but too short, waits for the next sentence
+
+    def feed(self, text):
+        self.buffer += text
+        parts = SENTENCE_END.split(self.buffer)
+        self.buffer = parts.pop() # Still being written
+        done = []
+        for part in parts:
+            part = (self.carry + " " + part).strip() if self.carry else part.strip()
+            if not part:
+                continue
+            if len(part) < MIN_SENTENCE:
+                self.carry = part
+                continue
+            done.append(part)
+            self.carry = ""
+        return done
+
+    def flush(self):
+        rest = (self.carry + " " + self.buffer).strip()
+        self.buffer = self.carry = ""
+        return [rest] if rest else []
+
+class SpeechPipeline:
+    """Synthesizes sentences in parallel (bounded) and reports finished segments strictly in order.
+
+    on_segment(index, path, text) fires as soon as segment `index` and every one before it are ready,
+    so playback can start after the first sentence instead of the whole reply."""
+
+    def __init__(self, path_for, on_segment, max_workers=3, cache=None):
+        self.path_for = path_for     # index -> output file path (unused with a cache)
+        self.on_segment = on_segment
+        self.cache = cache           # AudioCache: segments are served from / written to it
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="TTS")
+        self.lock = threading.Lock()
+        self.results = {}  # index -> (path, text) or None if synthesis failed
+        self.futures = []
+        self.next_emit = 0
+        self.emitted = 0
+        self.cancelled = False
+
+    def say(self, text):
+        if self.cancelled:
+            return None # Superseded; late sentences are dropped
+        index = len(self.futures)
+        self.futures.append(self.pool.submit(self._synthesize, index, text))
+        return index
+
+    def _synthesize(self, index, text):
+        if self.cancelled:
+            return
+        if self.cache:
+            path = self.cache.fetch(text, tag=self) # The TTSService jobs are tagged with their pipeline
+            ok = path is not None
+        else:
+            path = self.path_for(index)
+            ok = generate_audio_sync(text, path, tag=self)
+        with self.lock:
+            if self.cancelled:
+                return
+            self.results[index] = (path, text) if ok else None
+            # Emit everything that is now contiguous
+            while self.next_emit in self.results:
+                result = self.results.pop(self.next_emit)
+                if result:
+                    try:
+                        self.on_segment(self.next_emit, *result)
+                        self.emitted += 1
+                    except Exception as e:
+                        print(f"[TTS ERROR] Segment callback: {e}")
+                self.next_emit += 1
+
+    def close(self):
+        """No more sentences. Queued ones keep synthesizing in the background (the caller does not wait)."""
+        self.pool.shutdown(wait=False)
+
+    def cancel(self):
+        """Drops everything not emitted yet: queued sentences and in-flight synthesis. Returns how many were dropped."""
+        with self.lock:
+            self.cancelled = True
+        dropped = sum(1 for future in self.futures if future.cancel())
+        if _service is not None:
+            dropped += _service.cancel(self)
+        self.pool.shutdown(wait=False)
+        return dropped
+
+    def finish(self):
+        """Waits for every queued sentence. Returns how many segments were emitted."""
+        for future in self.futures:
+            if not future.cancelled():
+                future.result()
+        self.pool.shutdown(wait=True)
+        return self.emitted
+
 if __name__ == "__main__":
     text = "It's not like I wanted you to install me or anything! Baka!"
     if len(sys.argv) > 1:
@@ -1,4 +1,5 @@
 using System.Collections;
+using System.Collections.Generic;
 using UnityEngine;
 using UnityEngine.Networking;
 
@@ -9,6 +10,10 @@ public class SimpleAudioPlayer : MonoBehaviour
     public static SimpleAudioPlayer Instance { get; private set; }
     public float CurrentVolume { get; private set; }
 
+    // Sentence clips arrive while earlier ones are still playing: queue them instead of cutting in
+    private readonly Queue<string> pending = new Queue<string>();
+    private bool draining = false;
+
     void Awake()
     {
         if (Instance != null && Instance != this)
@@ -42,7 +47,19 @@ public class SimpleAudioPlayer : MonoBehaviour
 
     public void PlayFromFile(string absolutePath)
     {
-        StartCoroutine(LoadAndPlay(absolutePath));
+        pending.Enqueue(absolutePath);
+        if (!draining) StartCoroutine(PlayQueue());
+    }
+
+    IEnumerator PlayQueue()
+    {
+        draining = true;
+        while (pending.Count > 0)
+        {
+            yield return LoadAndPlay(pending.Dequeue());
+            while (audioSource.isPlaying) yield return null; // Let the clip finish
+        }
+        draining = false;
     }
 
     IEnumerator LoadAndPlay(string path)
@@ -65,11 +82,9 @@ public class SimpleAudioPlayer : MonoBehaviour
             eventUrl = path;
         }
 
-        // Debug.Log($"[AudioPlayer] Loading: {eventUrl}"); # Optional Debug
-
-        // Debug.Log($"[AudioPlayer] Loading: {eventUrl}"); # Optional Debug
+        // Debug.Log($"[AudioPlayer] Loading: {eventUrl}"); // Optional Debug
 
-        using (UnityWebRequest www = UnityWebRequestMultimedia.GetAudioClip(eventUrl, AudioType.MPEG)) # Force MPEG
+        using (UnityWebRequest www = UnityWebRequestMultimedia.GetAudioClip(eventUrl, AudioType.MPEG)) // Force MPEG
         {
             yield return www.SendWebRequest();
 